@@ -0,0 +1,303 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from app.models import ListingPage, ListingRecord
+from config import settings
+
+
+@dataclass
+class CacheEntry:
+    listings: List[ListingRecord]
+    expires_at: float  # Fresh until this time
+    stale_until: float  # May be served (while revalidating) until this time
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def is_usable(self, now: float) -> bool:
+        return now < self.stale_until
+
+
+class CacheBackend(ABC):
+    """Storage for cached search results."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return a usable (fresh or stale) entry, or None."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, listings: List[ListingRecord], ttl: float, stale_ttl: float) -> None:
+        """Store listings, fresh for `ttl` seconds and usable for `stale_ttl` more."""
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Return size and eviction counters."""
+        pass
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+        pass
+
+    async def aget(self, key: str) -> Optional[CacheEntry]:
+        """`get` for use on the event loop (backends doing blocking I/O run it in a thread)."""
+        return self.get(key)
+
+    async def aset(self, key: str, listings: List[ListingRecord], ttl: float, stale_ttl: float) -> None:
+        """`set` for use on the event loop (backends doing blocking I/O run it in a thread)."""
+        self.set(key, listings, ttl, stale_ttl)
+
+
+class ListingCache(CacheBackend):
+    """
+    In-memory LRU cache of source search results.
+
+    The memory budget is expressed as a total number of cached listings,
+    so a few huge result sets can't crowd out everything else unnoticed.
+    """
+
+    def __init__(self, max_listings: int):
+        self.max_listings = max_listings
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._size = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if not entry.is_usable(time.time()):
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, listings: List[ListingRecord], ttl: float, stale_ttl: float) -> None:
+        # Entries larger than the whole budget are never cached
+        weight = self._weight(listings)
+        if weight > self.max_listings:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        now = time.time()
+        self._entries[key] = CacheEntry(
+            listings=listings.copy(),
+            expires_at=now + ttl,
+            stale_until=now + ttl + stale_ttl,
+        )
+        self._size += weight
+
+        # Evict least recently used entries until back under budget
+        while self._size > self.max_listings:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "listings": self._size,
+            "max_listings": self.max_listings,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._size -= self._weight(entry.listings)
+
+    @staticmethod
+    def _weight(listings: List[ListingRecord]) -> int:
+        # Count the entry itself so empty results still take up space
+        return len(listings) + 1
+
+
+class SqliteListingCache(CacheBackend):
+    """
+    Persistent cache backend stored in a SQLite database (WAL mode).
+
+    All gunicorn workers open the same file, so results fetched by one
+    worker are reused by the others and survive restarts. Like the
+    in-memory cache, the budget is a total number of cached listings and
+    the least recently used entries are evicted first.
+
+    Calls from the event loop (aget/aset) run in worker threads, so a
+    write waiting on another worker's lock never stalls the process.
+    Reads don't write: access times are buffered and saved with the next
+    write, or after ACCESS_FLUSH_EVERY hits.
+    """
+
+    ACCESS_FLUSH_EVERY = 100
+
+    def __init__(self, path: str, max_listings: int):
+        self.max_listings = max_listings
+        self.evictions = 0
+        # One connection shared by the worker threads; transactions must not interleave
+        self._lock = threading.Lock()
+        self._accessed: Dict[str, float] = {}
+        self._conn = sqlite3.connect(
+            path,
+            timeout=5.0,
+            isolation_level=None,  # Autocommit; transactions are explicit
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS listing_cache (
+                key TEXT PRIMARY KEY,
+                listings TEXT NOT NULL,
+                weight INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                stale_until REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS listing_cache_accessed ON listing_cache (accessed_at)"
+        )
+
+    async def aget(self, key: str) -> Optional[CacheEntry]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, listings: List[ListingRecord], ttl: float, stale_ttl: float) -> None:
+        await asyncio.to_thread(self.set, key, listings, ttl, stale_ttl)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT listings, expires_at, stale_until FROM listing_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            # Expired rows are left for the next write's cleanup
+            payload, expires_at, stale_until = row
+            now = time.time()
+            if now >= stale_until:
+                return None
+
+            self._accessed[key] = now
+            if len(self._accessed) >= self.ACCESS_FLUSH_EVERY:
+                self._write(self._flush_accessed)
+
+        return CacheEntry(
+            listings=_load_listings(payload),
+            expires_at=expires_at,
+            stale_until=stale_until,
+        )
+
+    def set(self, key: str, listings: List[ListingRecord], ttl: float, stale_ttl: float) -> None:
+        weight = len(listings) + 1
+        if weight > self.max_listings:
+            return
+
+        now = time.time()
+        payload = _dump_listings(listings)
+
+        def insert() -> None:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO listing_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, weight, now + ttl, now + ttl + stale_ttl, now),
+            )
+            self._accessed.pop(key, None)
+            self._flush_accessed()
+            self._enforce_budget(now)
+
+        with self._lock:
+            self._write(insert)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(weight), 0) FROM listing_cache"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "listings": size,
+            "max_listings": self.max_listings,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._accessed:
+                self._write(self._flush_accessed)
+            self._conn.close()
+
+    def _write(self, fn) -> None:
+        """Run `fn` in a write transaction (caller holds the lock)."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            fn()
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _flush_accessed(self) -> None:
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE listing_cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def _enforce_budget(self, now: float) -> None:
+        # Drop entries that are past their stale window first
+        self._conn.execute("DELETE FROM listing_cache WHERE stale_until <= ?", (now,))
+
+        (size,) = self._conn.execute(
+            "SELECT COALESCE(SUM(weight), 0) FROM listing_cache"
+        ).fetchone()
+        excess = size - self.max_listings
+        if excess <= 0:
+            return
+
+        victims = []
+        for key, weight in self._conn.execute(
+            "SELECT key, weight FROM listing_cache ORDER BY accessed_at"
+        ):
+            victims.append((key,))
+            excess -= weight
+            if excess <= 0:
+                break
+
+        self._conn.executemany("DELETE FROM listing_cache WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+
+def _dump_listings(listings: List[ListingRecord]) -> str:
+    items = [asdict(listing) for listing in listings]
+    if isinstance(listings, ListingPage):
+        return json.dumps({"listings": items, "more": listings.more})
+    return json.dumps(items)
+
+
+def _load_listings(payload: str) -> List[ListingRecord]:
+    data = json.loads(payload)
+    if isinstance(data, list):
+        return [ListingRecord(**item) for item in data]  # Rows saved without page info
+    return ListingPage((ListingRecord(**item) for item in data["listings"]), data["more"])
+
+
+def create_cache() -> CacheBackend:
+    """Build the cache backend selected by `CACHE_BACKEND`."""
+    if settings.CACHE_BACKEND == "sqlite":
+        return SqliteListingCache(settings.CACHE_PATH, settings.CACHE_MAX_LISTINGS)
+
+    return ListingCache(max_listings=settings.CACHE_MAX_LISTINGS)
@@ -0,0 +1,62 @@
+import time
+from typing import Dict, Union
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one upstream source.
+
+    Closed: calls flow normally. After `failure_threshold` consecutive
+    failures the circuit opens and calls are rejected immediately. Once
+    `cooldown` seconds have passed, a single probe call is let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = self.HALF_OPEN
+            return True
+
+        # Open and cooling down, or a half-open probe is already in flight
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._open()
+
+    def release(self) -> None:
+        """Give up a half-open probe without an outcome (e.g. it was cancelled)."""
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+
+    def stats(self) -> Dict[str, Union[str, int]]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+        }
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
@@ -1,39 +1,226 @@
-from typing import List, Set
-from urllib.parse import urlparse
+import heapq
+import itertools
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
 
-from app.models import Listing
+from app.models import ListingRecord
 
+# Query parameters that only track clicks/campaigns, stripped on every host
+TRACKING_PARAMS = frozenset({
+    "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "utm_id",
+    "gclid", "gclsrc", "dclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "srsltid",
+})
 
-def deduplicate_listings(listings: List[Listing]) -> List[Listing]:
+# Extra tracking parameters per host (matched on the host's registrable suffix)
+HOST_TRACKING_PARAMS = {
+    "ebay.com": frozenset({
+        "hash", "_trkparms", "_trksid", "amdata", "mkcid", "mkrid", "mkevt",
+        "campid", "customid", "toolid", "siteid", "itmmeta", "itmprp", "_from", "epid",
+    }),
+    "amazon.com": frozenset({
+        "tag", "ref", "ref_", "psc", "th", "linkcode", "creative", "creativeasin",
+        "qid", "sr", "keywords", "crid", "sprefix", "dib", "dib_tag",
+    }),
+    "walmart.com": frozenset({"athbdg", "from", "wmlspartner", "affiliates_ad_id", "sourceid"}),
+    "bestbuy.com": frozenset({"irclickid", "irgwc", "ref", "loc", "acampid"}),
+    "target.com": frozenset({"afid", "cpng", "lnk", "clkid", "preselect"}),
+}
+
+_EBAY_ITEM_RE = re.compile(r"/itm/(?:[^/]+/)?(\d{9,15})")
+_GOOGLE_MERCHANT_RE = re.compile(r"^Google Shopping \((.+)\)$")
+
+
+@dataclass(frozen=True, slots=True)
+class ListingIdentity:
+    """
+    Keys identifying the offer behind a listing.
+
+    `url` is the canonical URL and `item` a marketplace item ID (eBay),
+    both exact identities. `offer` is a (merchant, condition, price in
+    cents) fingerprint that only collapses listings reported by different
+    sources, e.g. the same eBay offer returned by eBay and Google Shopping.
+    """
+
+    url: str
+    item: Optional[str]
+    offer: Tuple[str, str, int]
+    source: str
+
+
+class IdentityIndex:
+    """Hash-set index of listing identities for O(1) duplicate checks."""
+
+    def __init__(self):
+        self._keys: Set[str] = set()
+        self._offers: Dict[Tuple[str, str, int], str] = {}
+
+    def contains(self, identity: ListingIdentity) -> bool:
+        if identity.url in self._keys or (identity.item and identity.item in self._keys):
+            return True
+
+        # Same offer from another source is a cross-source duplicate
+        reported_by = self._offers.get(identity.offer)
+        return reported_by is not None and reported_by != identity.source
+
+    def add(self, identity: ListingIdentity) -> None:
+        self._keys.add(identity.url)
+        if identity.item:
+            self._keys.add(identity.item)
+        self._offers.setdefault(identity.offer, identity.source)
+
+    def remove(self, identity: ListingIdentity) -> None:
+        self._keys.discard(identity.url)
+        if identity.item:
+            self._keys.discard(identity.item)
+        if self._offers.get(identity.offer) == identity.source:
+            del self._offers[identity.offer]
+
+
+def deduplicate_listings(listings: List[ListingRecord]) -> List[ListingRecord]:
     """
-    Remove duplicate listings based on URL.
+    Remove duplicate listings (same canonical URL, eBay item ID, or the
+    same offer reported by two sources).
 
     Keeps the first occurrence (which should be the cheapest
     if listings are pre-sorted).
     """
-    seen_urls: Set[str] = set()
-    unique_listings: List[Listing] = []
+    index = IdentityIndex()
+    unique_listings: List[ListingRecord] = []
 
     for listing in listings:
-        # Normalize URL for comparison (remove trailing slashes, query params)
-        normalized_url = _normalize_url(listing.url)
+        identity = listing_identity(listing)
 
-        if normalized_url not in seen_urls:
-            seen_urls.add(normalized_url)
+        if not index.contains(identity):
+            index.add(identity)
             unique_listings.append(listing)
 
     return unique_listings
 
 
-def _normalize_url(url: str) -> str:
-    """Normalize URL for deduplication comparison."""
+class TopKListings:
+    """
+    Incrementally keeps the K cheapest unique listings.
+
+    Listings can be added as each source's results arrive. A bounded
+    max-heap holds the current top K, so adding n listings costs
+    O(n log K) and memory stays O(K). A listing that duplicates one
+    already held (see `listing_identity`) is rejected; among equal
+    prices, earlier listings win (same as a stable sort).
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        # Max-heap via negation: the root is the most expensive, latest-added entry
+        self._heap: List[Tuple[float, int, ListingIdentity, ListingRecord]] = []
+        self._index = IdentityIndex()
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def accepts(self, total_price: float) -> bool:
+        """Whether a listing at this price could still enter the top K."""
+        return len(self._heap) < self.k or total_price < -self._heap[0][0]
+
+    def add(self, listing: ListingRecord) -> bool:
+        """Offer a listing; return True if it is (for now) in the top K."""
+        # Cheap price check first: most listings never get near the top K,
+        # so skip URL canonicalization for them entirely
+        if not self.accepts(listing.total_price):
+            return False
+
+        full = len(self._heap) >= self.k
+
+        identity = listing_identity(listing)
+        if self._index.contains(identity):
+            return False
+
+        entry = (-listing.total_price, -next(self._counter), identity, listing)
+
+        if full:
+            # Cheaper than the current K-th listing: evict it
+            evicted = heapq.heapreplace(self._heap, entry)
+            self._index.remove(evicted[2])
+        else:
+            heapq.heappush(self._heap, entry)
+
+        self._index.add(identity)
+        return True
+
+    def extend(self, listings: Iterable[ListingRecord]) -> None:
+        for listing in listings:
+            self.add(listing)
+
+    def results(self) -> List[ListingRecord]:
+        """Current top listings, cheapest first."""
+        return [entry[3] for entry in sorted(self._heap, reverse=True)]
+
+
+def listing_identity(listing: ListingRecord) -> ListingIdentity:
+    """Compute the identity keys used for deduplication."""
+    url, item = _canonicalize(listing.url)
+    merchant = _merchant(listing.source)
+    return ListingIdentity(
+        url=url,
+        item=item,
+        offer=(merchant, listing.condition, round(listing.total_price * 100)),
+        source=listing.source,
+    )
+
+
+@lru_cache(maxsize=8192)
+def _canonicalize(url: str) -> Tuple[str, Optional[str]]:
+    """
+    Return (canonical URL, marketplace item key) for a listing URL.
+
+    Scheme and "www." are ignored, trailing slashes and tracking
+    parameters are dropped, and eBay item pages collapse to /itm/<id>.
+    Other query parameters are kept (needed for Google Shopping).
+    """
     try:
-        parsed = urlparse(url)
-        # Keep full URL including query params (needed for Google Shopping)
-        # Only strip trailing slashes from path
-        path = parsed.path.rstrip('/')
-        query = f"?{parsed.query}" if parsed.query else ""
-        normalized = f"{parsed.scheme}://{parsed.netloc}{path}{query}"
-        return normalized.lower()
-    except Exception:
-        return url.lower()
+        parts = urlsplit(url)
+    except ValueError:
+        return url.lower(), None
+
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+
+    item = None
+    if "ebay." in host:
+        match = _EBAY_ITEM_RE.search(path)
+        if match:
+            item = f"ebay:{match.group(1)}"
+            path = f"/itm/{match.group(1)}"
+
+    query = parts.query
+    if query:
+        blocked = HOST_TRACKING_PARAMS.get(_site(host), frozenset())
+        kept = [
+            param for param in query.split("&")
+            if param and _param_name(param) not in TRACKING_PARAMS
+            and _param_name(param) not in blocked
+        ]
+        query = "&".join(kept)
+
+    canonical = f"{host}{path}?{query}" if query else f"{host}{path}"
+    return canonical.lower(), item
+
+
+def _site(host: str) -> str:
+    """Registrable suffix used to look up per-host tracking params (e.g. ebay.com)."""
+    return ".".join(host.rsplit(".", 2)[-2:])
+
+
+def _param_name(param: str) -> str:
+    return param.split("=", 1)[0].lower()
+
+
+def _merchant(source: str) -> str:
+    """Merchant behind a listing: 'Google Shopping (eBay)' and 'eBay' are both 'ebay'."""
+    match = _GOOGLE_MERCHANT_RE.match(source)
+    return (match.group(1) if match else source).lower()
@@ -0,0 +1,125 @@
+import asyncio
+import time
+from typing import AsyncIterator, Callable, List, Optional, Set, Tuple
+
+from app import metrics
+from app.models import ListingRecord, has_more_pages
+from app.sources.base import Source
+from config import settings
+
+
+class SourceFanOut:
+    """
+    Run one query against several sources under a shared deadline.
+
+    Results are yielded page by page as they arrive. Sources still running
+    when the deadline passes are cancelled and listed in `timed_out`;
+    sources whose search raised are listed in `failed`.
+
+    With `pages` > 1, each source's pages are fetched concurrently in waves
+    of PAGE_FETCH_CONCURRENCY. Paging stops at the last page, or, for
+    sources sorted by price, as soon as `can_stop(price)` says a page's
+    most expensive listing can no longer beat the current results.
+    """
+
+    def __init__(
+        self,
+        sources: List[Source],
+        query: str,
+        deadline: Optional[float] = None,
+        pages: int = 1,
+        can_stop: Optional[Callable[[float], bool]] = None,
+    ):
+        self.sources = sources
+        self.query = query
+        self.deadline = deadline
+        self.pages = pages
+        self.can_stop = can_stop
+        self.timed_out: List[str] = []
+        self.failed: List[str] = []
+
+    async def results(self) -> AsyncIterator[Tuple[Source, List[ListingRecord]]]:
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + self.deadline if self.deadline else None
+
+        # Pages are pushed as they arrive with a future resolved once the caller
+        # has consumed them; (source, None, None) marks a finished source
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks = [asyncio.ensure_future(self._run(source, queue)) for source in self.sources]
+        finished: Set[Source] = set()
+
+        try:
+            while len(finished) < len(self.sources):
+                timeout = None if deadline_at is None else max(0.0, deadline_at - loop.time())
+                try:
+                    source, listings, consumed = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break  # Deadline reached
+
+                if listings is None:
+                    finished.add(source)
+                else:
+                    yield source, listings
+                    consumed.set_result(None)
+        finally:
+            # Cancel whatever missed the deadline (or is abandoned by the caller)
+            for task in tasks:
+                task.cancel()
+            self.timed_out = [s.name for s in self.sources if s not in finished]
+            for name in self.timed_out:
+                metrics.SOURCE_TIMEOUTS.labels(name).inc()
+
+    async def _run(self, source: Source, queue: asyncio.Queue) -> None:
+        try:
+            await self._fetch_pages(source, queue)
+        except Exception:
+            # Failed sources are skipped; the error was counted in _search_page
+            self._fail(source)
+        finally:
+            queue.put_nowait((source, None, None))
+
+    async def _fetch_pages(self, source: Source, queue: asyncio.Queue) -> None:
+        page = 1
+        while page <= self.pages:
+            last = min(self.pages, page + settings.PAGE_FETCH_CONCURRENCY - 1)
+            wave = await asyncio.gather(
+                *(self._search_page(source, number) for number in range(page, last + 1)),
+                return_exceptions=True,
+            )
+
+            consumed = []
+            for listings in wave:
+                if isinstance(listings, BaseException):
+                    self._fail(source)
+                    return  # Keep the pages before the failed one
+                consumed.append(asyncio.get_running_loop().create_future())
+                queue.put_nowait((source, listings, consumed[-1]))
+                if not has_more_pages(listings, source.page_size):
+                    return  # Last page of results
+
+            if source.sorted_by_price and self.can_stop and last < self.pages:
+                # Let the caller merge this wave, then check whether later
+                # pages (all at least this expensive) could still make the cut
+                await asyncio.gather(*consumed)
+                highest = max(listing.total_price for listing in wave[-1])
+                if self.can_stop(highest):
+                    return
+
+            page = last + 1
+
+    def _fail(self, source: Source) -> None:
+        if source.name not in self.failed:
+            self.failed.append(source.name)
+
+    async def _search_page(self, source: Source, page: int) -> List[ListingRecord]:
+        started = time.perf_counter()
+        try:
+            listings = await source.search(self.query, page)
+        except Exception as exc:
+            metrics.SOURCE_ERRORS.labels(source.name, type(exc).__name__).inc()
+            raise
+        finally:
+            metrics.SOURCE_SEARCH_SECONDS.labels(source.name).observe(time.perf_counter() - started)
+
+        metrics.SOURCE_LISTINGS.labels(source.name).inc(len(listings))
+        return listings
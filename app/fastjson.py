@@ -0,0 +1,42 @@
+import json
+from typing import Any, Callable, Union
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up: pip install orjson
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+PathKey = Union[str, int]
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON with orjson when installed, else the stdlib. Raises ValueError."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def compile_path(*path: PathKey, default: Any = None) -> Callable[[Any], Any]:
+    """
+    Build a getter for a fixed path into decoded JSON.
+
+    `compile_path("a", 0, "b")(doc)` returns `doc["a"][0]["b"]`, or
+    `default` if any step is missing or has the wrong type. Steps are plain
+    subscripts in one try block, so items don't build the throwaway `[{}]`
+    defaults of chained `.get(..., [{}])[0]` calls.
+    """
+    for step in path:
+        if not isinstance(step, (str, int)):
+            raise TypeError(f"path steps must be str or int, got {step!r}")
+
+    def get(doc: Any) -> Any:
+        try:
+            for step in path:
+                doc = doc[step]
+            return doc
+        except (KeyError, IndexError, TypeError):
+            return default
+
+    return get
@@ -0,0 +1,59 @@
+from collections import deque
+from typing import Deque, Optional
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent call latencies for one source.
+
+    `percentile()` is recomputed only every `recompute_every` samples, so
+    reading it on every call stays O(1).
+    """
+
+    def __init__(self, window: int, min_samples: int, recompute_every: int = 10):
+        self.min_samples = min_samples
+        self.recompute_every = recompute_every
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._since_recompute = 0
+        self._sorted: list = []
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._since_recompute += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """The p-th percentile latency, or None until `min_samples` calls were seen."""
+        if len(self._samples) < self.min_samples:
+            return None
+        if self._since_recompute >= self.recompute_every or not self._sorted:
+            self._sorted = sorted(self._samples)
+            self._since_recompute = 0
+        rank = min(len(self._sorted) - 1, int(len(self._sorted) * p / 100))
+        return self._sorted[rank]
+
+
+class HedgeBudget:
+    """
+    Caps hedged requests at a fraction of all requests.
+
+    Every request earns `ratio` of a token (up to `burst` tokens); a hedge
+    spends a whole one. With ratio 0.05, at most ~5% extra upstream calls
+    are made no matter how slow the upstream gets.
+    """
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = 0.0
+
+    def on_request(self) -> None:
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
@@ -0,0 +1,400 @@
+import array
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.models import ListingRecord, PricePoint
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; appends are then only safe from one process
+    fcntl = None
+
+try:
+    import numpy as np
+except ImportError:  # In requirements.txt; the pure-Python fallback is much slower
+    np = None
+
+# Column files of a segment: (name, array typecode, numpy dtype).
+# Prices are stored as integer cents (totals fit int32 up to $21M); source and condition are
+# dictionary-encoded against the segment's meta.json.
+COLUMNS = (
+    ("timestamp", "d", "=f8"),
+    ("price", "i", "=i4"),
+    ("shipping", "i", "=i4"),
+    ("source", "H", "=u2"),
+    ("condition", "B", "=u1"),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PricePointRecord:
+    """One recorded listing price."""
+
+    timestamp: float
+    total_price: float
+    price: float
+    shipping: float
+    source: str
+    condition: str
+
+    def to_point(self) -> PricePoint:
+        return PricePoint(
+            timestamp=self.timestamp,
+            total_price=self.total_price,
+            price=self.price,
+            shipping=self.shipping,
+            source=self.source,
+            condition=self.condition,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class PriceStats:
+    """Total-price aggregates over a time window."""
+
+    count: int
+    min: float
+    max: float
+    mean: float
+    median: float
+    percentiles: Dict[float, float]
+
+
+class PriceHistory:
+    """
+    Append-only, columnar price history.
+
+    Each normalized query gets a segment directory holding one packed
+    binary file per column (see COLUMNS), so a price point costs 19 bytes
+    on disk. Reads memory-map the column files and, when numpy is
+    installed, aggregate them as zero-copy arrays; timestamps only grow,
+    so a time window is found by binary search.
+
+    Points are buffered in memory and appended by `flush()`, under a file
+    lock so several worker processes can share one history directory.
+    `flush`, `stats` and `lowest` do blocking I/O; the app runs them in
+    worker threads.
+    """
+
+    def __init__(self, path: str, sample_interval: float):
+        self.path = path
+        self.sample_interval = sample_interval
+        self._pending: Dict[str, List[Tuple[float, Tuple[ListingRecord, ...]]]] = {}
+        self._last_recorded: Dict[str, float] = {}
+        # Guards the buffer: record() runs on the event loop, flush() in worker threads
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def record(self, query: str, listings: Sequence[ListingRecord]) -> bool:
+        """
+        Buffer a comparison result for `query`.
+
+        At most one result per query is kept every `sample_interval`
+        seconds, so repeated (often cached) lookups don't skew the stats.
+        """
+        if not listings:
+            return False
+
+        now = time.time()
+        if now - self._last_recorded.get(query, 0.0) < self.sample_interval:
+            return False
+
+        self._last_recorded[query] = now
+        with self._lock:
+            self._pending.setdefault(query, []).append((now, tuple(listings)))
+        return True
+
+    def flush(self, query: Optional[str] = None) -> int:
+        """Append buffered points (for one query, or all) to disk; return the count."""
+        with self._lock:
+            queries = [query] if query is not None else list(self._pending)
+            taken = [(name, self._pending.pop(name, None)) for name in queries]
+        written = 0
+        for name, batches in taken:
+            if batches:
+                written += self._append(name, batches)
+        return written
+
+    def stats(
+        self,
+        query: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        percentiles: Sequence[float] = (50.0,),
+        source: Optional[str] = None,
+        condition: Optional[str] = None,
+    ) -> Optional[PriceStats]:
+        """Aggregate total prices recorded in [since, until]; None if there are none."""
+        self.flush(query)
+        with self._open(query) as segment:
+            if segment is None:
+                return None
+            columns, meta = segment
+            if np is not None:
+                return _stats_numpy(columns, meta, since, until, percentiles, source, condition)
+            return _stats_python(columns, meta, since, until, percentiles, source, condition)
+
+    def lowest(
+        self,
+        query: str,
+        source: Optional[str] = None,
+        condition: Optional[str] = None,
+    ) -> Optional[PricePointRecord]:
+        """Cheapest total price ever recorded for `query` (earliest on ties)."""
+        self.flush(query)
+        with self._open(query) as segment:
+            if segment is None:
+                return None
+            columns, meta = segment
+            count = len(columns["timestamp"])
+            rows = _filtered_rows(columns, meta, 0, count, source, condition)
+            if np is not None:
+                if rows is not None and not rows.any():
+                    return None
+                totals = columns["price"] + columns["shipping"]
+                if rows is not None:
+                    totals = np.where(rows, totals, np.iinfo(totals.dtype).max)
+                row = int(np.argmin(totals))
+            else:
+                prices, shipping = columns["price"], columns["shipping"]
+                candidates = range(count) if rows is None else rows
+                row = min(candidates, key=lambda i: prices[i] + shipping[i], default=None)
+                if row is None:
+                    return None
+            return _point(columns, meta, row)
+
+    def summary(self) -> Dict[str, int]:
+        """Number of recorded queries and buffered (unflushed) points."""
+        return {
+            "queries": sum(1 for entry in os.scandir(self.path) if entry.is_dir()),
+            "pending": sum(len(listings) for batches in list(self._pending.values()) for _, listings in batches),
+        }
+
+    def _segment_path(self, query: str) -> str:
+        return os.path.join(self.path, hashlib.sha1(query.lower().encode("utf-8")).hexdigest()[:16])
+
+    def _append(self, query: str, batches: List[Tuple[float, Tuple[ListingRecord, ...]]]) -> int:
+        directory = self._segment_path(query)
+        os.makedirs(directory, exist_ok=True)
+
+        with _locked(os.path.join(directory, ".lock")):
+            # Drop the tail of an append that was interrupted part-way through the columns
+            rows = _row_count(directory)
+            for name, typecode, _dtype in COLUMNS:
+                column_path = os.path.join(directory, name)
+                if os.path.exists(column_path) and os.path.getsize(column_path) > rows * _itemsize(typecode):
+                    os.truncate(column_path, rows * _itemsize(typecode))
+
+            meta = _read_meta(directory) or {"query": query, "sources": [], "conditions": []}
+            known = (len(meta["sources"]), len(meta["conditions"]))
+            sources = {name: i for i, name in enumerate(meta["sources"])}
+            conditions = {name: i for i, name in enumerate(meta["conditions"])}
+
+            # Never write a timestamp older than the last one on disk (another
+            # process may have flushed later points), so the column stays sorted
+            latest = _last_timestamp(directory, rows)
+            values = {name: array.array(typecode) for name, typecode, _dtype in COLUMNS}
+            for recorded_at, listings in batches:
+                timestamp = max(recorded_at, latest)
+                for listing in listings:
+                    values["timestamp"].append(timestamp)
+                    values["price"].append(round(listing.price * 100))
+                    values["shipping"].append(round(listing.shipping * 100))
+                    values["source"].append(_encode(sources, meta["sources"], listing.source))
+                    values["condition"].append(_encode(conditions, meta["conditions"], listing.condition))
+
+            if known != (len(meta["sources"]), len(meta["conditions"])) or rows == 0:
+                _write_meta(directory, meta)
+            for name, column in values.items():
+                with open(os.path.join(directory, name), "ab") as f:
+                    column.tofile(f)
+
+        return len(values["timestamp"])
+
+    @contextmanager
+    def _open(self, query: str) -> Iterator[Optional[Tuple[Dict[str, Sequence], dict]]]:
+        """Memory-map a segment's columns (numpy arrays or memoryviews)."""
+        directory = self._segment_path(query)
+        meta = _read_meta(directory)
+        rows = _row_count(directory) if meta is not None else 0
+        if rows == 0:
+            yield None
+            return
+
+        # The maps are unmapped when the last array/view over them is released
+        columns: Dict[str, Sequence] = {}
+        for name, typecode, dtype in COLUMNS:
+            with open(os.path.join(directory, name), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if np is not None:
+                columns[name] = np.frombuffer(mapped, dtype=dtype, count=rows)
+            else:
+                columns[name] = memoryview(mapped)[:rows * _itemsize(typecode)].cast(typecode)
+        yield columns, meta
+
+
+def _stats_numpy(columns, meta, since, until, percentiles, source, condition) -> Optional[PriceStats]:
+    start, end = _window(columns["timestamp"], since, until)
+    totals = columns["price"][start:end] + columns["shipping"][start:end]
+    rows = _filtered_rows(columns, meta, start, end, source, condition)
+    if rows is not None:
+        totals = totals[rows]
+    if totals.size == 0:
+        return None
+
+    points = np.percentile(totals, [50.0, *percentiles]) / 100
+    return PriceStats(
+        count=int(totals.size),
+        min=float(totals.min()) / 100,
+        max=float(totals.max()) / 100,
+        mean=round(float(totals.mean()) / 100, 2),
+        median=round(float(points[0]), 2),
+        percentiles={p: round(float(v), 2) for p, v in zip(percentiles, points[1:])},
+    )
+
+
+def _stats_python(columns, meta, since, until, percentiles, source, condition) -> Optional[PriceStats]:
+    start, end = _window(columns["timestamp"], since, until)
+    rows = _filtered_rows(columns, meta, start, end, source, condition)
+    prices, shipping = columns["price"], columns["shipping"]
+    if rows is None:
+        totals = [p + s for p, s in zip(prices[start:end], shipping[start:end])]
+    else:
+        totals = [prices[i] + shipping[i] for i in rows]
+    if not totals:
+        return None
+
+    totals.sort()
+    return PriceStats(
+        count=len(totals),
+        min=totals[0] / 100,
+        max=totals[-1] / 100,
+        mean=round(sum(totals) / len(totals) / 100, 2),
+        median=round(_percentile(totals, 50.0) / 100, 2),
+        percentiles={p: round(_percentile(totals, p) / 100, 2) for p in percentiles},
+    )
+
+
+def _window(timestamps: Sequence[float], since: Optional[float], until: Optional[float]) -> Tuple[int, int]:
+    """Row range [start, end) with since <= timestamp <= until."""
+    if np is not None:
+        start = 0 if since is None else int(np.searchsorted(timestamps, since, "left"))
+        end = len(timestamps) if until is None else int(np.searchsorted(timestamps, until, "right"))
+    else:
+        start = 0 if since is None else bisect.bisect_left(timestamps, since)
+        end = len(timestamps) if until is None else bisect.bisect_right(timestamps, until)
+    return start, max(start, end)
+
+
+def _filtered_rows(columns, meta, start: int, end: int, source: Optional[str], condition: Optional[str]):
+    """
+    Rows in [start, end) matching the source/condition filters: None when
+    unfiltered, else a boolean mask (numpy) or a list of row numbers.
+    """
+    wanted = []
+    for column, value in (("source", source), ("condition", condition)):
+        if value is None:
+            continue
+        names = meta[column + "s"]
+        if value not in names:
+            return np.zeros(end - start, dtype=bool) if np is not None else []
+        wanted.append((columns[column], names.index(value)))
+
+    if not wanted:
+        return None
+
+    if np is not None:
+        mask = np.ones(end - start, dtype=bool)
+        for values, code in wanted:
+            mask &= values[start:end] == code
+        return mask
+
+    return [i for i in range(start, end) if all(values[i] == code for values, code in wanted)]
+
+
+def _percentile(ordered: List[int], p: float) -> float:
+    """Linear-interpolated percentile of sorted values (numpy's default method)."""
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _point(columns, meta, row: int) -> PricePointRecord:
+    price = int(columns["price"][row])
+    shipping = int(columns["shipping"][row])
+    return PricePointRecord(
+        timestamp=float(columns["timestamp"][row]),
+        total_price=(price + shipping) / 100,
+        price=price / 100,
+        shipping=shipping / 100,
+        source=_decode(meta["sources"], int(columns["source"][row])),
+        condition=_decode(meta["conditions"], int(columns["condition"][row])),
+    )
+
+
+def _itemsize(typecode: str) -> int:
+    return array.array(typecode).itemsize
+
+
+def _row_count(directory: str) -> int:
+    """Complete rows in a segment (a crash mid-append can leave some columns longer)."""
+    try:
+        return min(
+            os.path.getsize(os.path.join(directory, name)) // _itemsize(typecode)
+            for name, typecode, _dtype in COLUMNS
+        )
+    except FileNotFoundError:
+        return 0
+
+
+def _last_timestamp(directory: str, rows: int) -> float:
+    if rows == 0:
+        return 0.0
+    with open(os.path.join(directory, "timestamp"), "rb") as f:
+        f.seek((rows - 1) * _itemsize("d"))
+        return array.array("d", f.read(_itemsize("d")))[0]
+
+
+def _encode(codes: Dict[str, int], names: List[str], value: str) -> int:
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(names)
+        names.append(value)
+    return code
+
+
+def _decode(names: List[str], code: int) -> str:
+    return names[code] if code < len(names) else "unknown"
+
+
+def _read_meta(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_meta(directory: str, meta: dict) -> None:
+    # Replace atomically so readers never see a half-written dictionary
+    path = os.path.join(directory, "meta.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(path + ".tmp", path)
+
+
+@contextmanager
+def _locked(path: str) -> Iterator[None]:
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
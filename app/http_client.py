@@ -0,0 +1,56 @@
+import time
+from typing import Any, Optional
+
+import httpx
+
+from config import settings
+
+
+def http2_supported() -> bool:
+    """HTTP/2 needs the optional `h2` package (`pip install httpx[http2]`)."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create a long-lived, connection-pooled client for one upstream host.
+
+    Clients are created and closed by the app lifespan and injected into
+    sources, so TCP/TLS handshakes are paid once instead of per request.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        http2=settings.HTTP2_ENABLED and http2_supported(),
+    )
+
+
+class ConnectTrace:
+    """
+    httpx trace hook (the `trace` request extension) that measures time
+    spent opening a new connection: TCP connect plus TLS handshake.
+    `connect` stays None when a pooled connection was reused.
+    """
+
+    __slots__ = ("_started", "connect")
+
+    def __init__(self):
+        self._started: Optional[float] = None
+        self.connect: Optional[float] = None
+
+    async def __call__(self, event_name: str, info: Any) -> None:
+        if event_name == "connection.connect_tcp.started":
+            self._started = time.perf_counter()
+        elif self._started is not None and event_name in (
+            "connection.connect_tcp.complete",
+            "connection.start_tls.complete",
+        ):
+            self.connect = time.perf_counter() - self._started
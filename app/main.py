@@ -1,26 +1,61 @@
 import asyncio
+import hashlib
 import secrets
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import Depends, FastAPI, HTTPException, status
-from fastapi.responses import FileResponse
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 
 from config import settings
 
-from app.deduplicator import deduplicate_listings
-from app.models import CompareRequest, CompareResponse, Listing
-from app.normalizer import normalize_product
-from app.sources.base import Source
+from app import metrics
+from app.cache import create_cache
+from app.deduplicator import TopKListings
+from app.fanout import SourceFanOut
+from app.history import PriceHistory
+from app.http_client import create_http_client
+from app.models import (
+    BatchCompareItem,
+    BatchCompareRequest,
+    BatchCompareResponse,
+    CompareRequest,
+    CompareResponse,
+    CompareStreamEvent,
+    HistoricalLow,
+    Listing,
+    ListingPage,
+    ListingRecord,
+    PriceHistoryStats,
+    WatchlistAddRequest,
+    WatchlistHistory,
+    WatchlistItem,
+    WatchlistSnapshot,
+)
+from app.normalizer import NormalizedProduct, normalize_product
+from app.ratelimit import BACKGROUND
+from app.relevance import filter_relevant
+from app.sources.base import HttpSource, Source
+from app.sources.cached import CachedSource
+from app.sources.coalesced import CoalescedSource
 from app.sources.ebay import EbaySource
+from app.sources.guarded import CircuitBreakerSource
+from app.sources.hedged import HedgedSource
 from app.sources.mock import MockSource
+from app.sources.ratelimited import RateLimitedSource
 from app.sources.serpapi import SerpApiSource
-
-app = FastAPI(
-    title="Price Comparison API",
-    description="Compare prices across multiple marketplaces",
-    version="0.1.0",
+from app.static import CompressionMiddleware, PrecompressedAsset, etag_matches
+from app.warmup import CacheWarmer, QueryLog
+from app.watchlist import (
+    Watchlist,
+    WatchlistFullError,
+    WatchlistRefreshError,
+    WatchlistScheduler,
+    WatchedProduct,
 )
 
 # Initialize all sources
@@ -30,6 +65,116 @@ SOURCES: List[Source] = [
     MockSource(),
 ]
 
+# Upstream calls are rate limited, hedged when slow (hedges count against the
+# rate limit) and guarded by a circuit breaker per source
+RATE_LIMITED_SOURCES: List[RateLimitedSource] = [RateLimitedSource(source) for source in SOURCES]
+HEDGED_SOURCES: List[HedgedSource] = [HedgedSource(source) for source in RATE_LIMITED_SOURCES]
+GUARDED_SOURCES: List[CircuitBreakerSource] = [
+    CircuitBreakerSource(source) for source in HEDGED_SOURCES
+]
+
+# Concurrent identical searches share one upstream request per source
+COALESCED_SOURCES: List[CoalescedSource] = [CoalescedSource(source) for source in GUARDED_SOURCES]
+
+# Search results are cached per source, keyed on the normalized query
+LISTING_CACHE = create_cache()
+CACHED_SOURCES: List[CachedSource] = (
+    [CachedSource(source, LISTING_CACHE) for source in COALESCED_SOURCES]
+    if settings.CACHE_ENABLED
+    else []
+)
+SEARCH_SOURCES: List[Source] = CACHED_SOURCES or COALESCED_SOURCES
+
+# The frontend is read and compressed once, then served from memory
+FRONTEND = PrecompressedAsset.load(Path(__file__).parent.parent / "index.html", "text/html; charset=utf-8")
+
+# Returned listings are recorded for price-history queries
+PRICE_HISTORY: Optional[PriceHistory] = (
+    PriceHistory(settings.HISTORY_PATH, settings.HISTORY_SAMPLE_INTERVAL)
+    if settings.HISTORY_ENABLED
+    else None
+)
+
+# Watched products are refreshed in the background and read from memory
+WATCHLIST = Watchlist(settings.WATCHLIST_MAX_PRODUCTS, settings.WATCHLIST_MAX_DELTAS)
+
+# Requested queries are logged so the most popular can be re-fetched after a restart
+QUERY_LOG: Optional[QueryLog] = (
+    QueryLog(settings.QUERY_LOG_PATH, settings.QUERY_LOG_MAX_QUERIES, settings.QUERY_LOG_MAX_AGE)
+    if settings.QUERY_LOG_ENABLED
+    else None
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create one pooled HTTP client per upstream source and close them on shutdown."""
+    http_sources = [s for s in SOURCES if isinstance(s, HttpSource)]
+    clients = []
+    for source in http_sources:
+        client = create_http_client()
+        source.bind_client(client)
+        clients.append(client)
+
+    if WATCHLIST_SCHEDULER is not None:
+        WATCHLIST_SCHEDULER.start()
+    history_flusher = asyncio.create_task(_flush_history()) if PRICE_HISTORY is not None else None
+    query_log_saver = None
+    if QUERY_LOG is not None:
+        QUERY_LOG.load()
+        query_log_saver = asyncio.create_task(_save_query_log())
+    if CACHE_WARMER is not None:
+        CACHE_WARMER.start()
+
+    try:
+        yield
+    finally:
+        if CACHE_WARMER is not None:
+            await CACHE_WARMER.stop()
+        if WATCHLIST_SCHEDULER is not None:
+            await WATCHLIST_SCHEDULER.stop()
+        if history_flusher is not None:
+            history_flusher.cancel()
+            PRICE_HISTORY.flush()
+        if query_log_saver is not None:
+            query_log_saver.cancel()
+            await asyncio.gather(query_log_saver, return_exceptions=True)
+            await QUERY_LOG.asave()
+        for source in http_sources:
+            source.bind_client(None)
+        for client in clients:
+            await client.aclose()
+        LISTING_CACHE.close()
+
+
+async def _flush_history() -> None:
+    """Append buffered price-history points to disk every HISTORY_FLUSH_INTERVAL."""
+    while True:
+        await asyncio.sleep(settings.HISTORY_FLUSH_INTERVAL)
+        await asyncio.to_thread(PRICE_HISTORY.flush)
+
+
+async def _save_query_log() -> None:
+    """Merge newly logged queries into the query-log file every QUERY_LOG_SAVE_INTERVAL."""
+    while True:
+        await asyncio.sleep(settings.QUERY_LOG_SAVE_INTERVAL)
+        await QUERY_LOG.asave()
+
+
+app = FastAPI(
+    title="Price Comparison API",
+    description="Compare prices across multiple marketplaces",
+    version="0.1.0",
+    lifespan=lifespan,
+)
+
+# Compress large JSON responses (e.g. /compare with a high `limit`, batches)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESSLEVEL,
+)
+
 # HTTP Basic Auth (auto_error=False allows requests without credentials)
 security = HTTPBasic(auto_error=False)
 
@@ -72,40 +217,539 @@ async def compare_prices(
     """
     Compare prices for a product across multiple sources.
 
-    Returns up to 10 listings sorted by total price (cheapest first).
+    Returns up to `limit` (default 10) listings sorted by total price (cheapest first).
+    """
+    with metrics.REQUEST_SECONDS.labels("compare").time():
+        # Normalize the product name
+        normalized = normalize_product(request.product_name)
+        _log_query(normalized)
+        return await _compare(normalized, _deadline(request), request.limit, request.pages)
+
+
+@app.get("/compare", response_model=CompareResponse)
+async def compare_prices_get(
+    http_request: Request,
+    request: CompareRequest = Depends(),
+    _: None = Depends(verify_credentials)
+) -> Response:
+    """
+    Cacheable GET form of /compare (same fields, as query parameters).
+
+    Responses carry an ETag derived from the ranked results and a max-age
+    of however long the oldest cached source result stays fresh. A request
+    whose If-None-Match still matches gets 304 Not Modified with no body.
+    Partial results and results built from stale cache entries are never
+    cached.
+    """
+    with metrics.REQUEST_SECONDS.labels("compare_get").time():
+        normalized = normalize_product(request.product_name)
+        _log_query(normalized)
+        result = await _search(normalized, _deadline(request), request.limit, request.pages)
+        response = _compare_response(normalized, result)
+
+    etag = _results_etag(response)
+    headers = {"ETag": etag, "Cache-Control": _compare_cache_control(response, result.expires_at)}
+    if etag_matches(http_request.headers.get("if-none-match"), [etag]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(response.model_dump_json(), media_type="application/json", headers=headers)
+
+
+@app.post("/compare/stream")
+async def compare_prices_stream(
+    request: CompareRequest,
+    _: None = Depends(verify_credentials)
+) -> StreamingResponse:
+    """
+    Streaming variant of /compare (newline-delimited JSON).
+
+    Emits an "update" event with the current top listings each time a source
+    finishes, then a final "done" event, so fast sources show up without
+    waiting for the slowest one.
     """
-    # Normalize the product name
+    started = time.perf_counter()
     normalized = normalize_product(request.product_name)
     query = normalized.search_query
+    _log_query(normalized)
+    available_sources = [s for s in SEARCH_SOURCES if s.is_available()]
+    top = TopKListings(request.limit)
+    fanout = SourceFanOut(
+        available_sources,
+        query,
+        _deadline(request),
+        pages=request.pages,
+        can_stop=lambda price: not top.accepts(price),
+    )
+
+    async def events() -> AsyncIterator[str]:
+        async for source, listings in fanout.results():
+            _add_relevant(top, listings, normalized)
+            event = CompareStreamEvent(
+                event="update",
+                source=source.name,
+                query=query,
+                results=_to_listings(_ranked(top)),
+            )
+            yield event.model_dump_json() + "\n"
+
+        records = _ranked(top)
+        _record_history(normalized, records)
+        event = CompareStreamEvent(
+            event="done",
+            query=query,
+            results=_to_listings(records),
+            partial=bool(fanout.timed_out or fanout.failed),
+            timed_out_sources=fanout.timed_out,
+            failed_sources=fanout.failed,
+        )
+        metrics.REQUEST_SECONDS.labels("compare_stream").observe(time.perf_counter() - started)
+        yield event.model_dump_json() + "\n"
 
-    # Get available sources
-    available_sources = [s for s in SOURCES if s.is_available()]
+    return StreamingResponse(events(), media_type="application/x-ndjson")
 
-    # Fetch from all sources in parallel
-    search_tasks = [source.search(query) for source in available_sources]
-    results = await asyncio.gather(*search_tasks, return_exceptions=True)
 
-    # Combine all listings
-    all_listings: List[Listing] = []
-    for result in results:
-        if isinstance(result, list):
-            all_listings.extend(result)
+@app.post("/compare/batch", response_model=BatchCompareResponse)
+async def compare_batch(
+    request: BatchCompareRequest,
+    _: None = Depends(verify_credentials)
+) -> BatchCompareResponse:
+    """
+    Compare prices for many products in one call.
 
-    # Deduplicate
-    unique_listings = deduplicate_listings(all_listings)
+    Results are returned in input order. Use /compare/batch/stream for
+    large batches to receive each result as soon as it is ready.
+    """
+    results = [item async for item in _run_batch(request.items)]
+    results.sort(key=lambda item: item.index)
+    return BatchCompareResponse(results=results)
 
-    # Sort by total price (ascending)
-    sorted_listings = sorted(unique_listings, key=lambda x: x.total_price)
 
-    # Return top 10
-    top_listings = sorted_listings[:10]
+@app.post("/compare/batch/stream")
+async def compare_batch_stream(
+    request: BatchCompareRequest,
+    _: None = Depends(verify_credentials)
+) -> StreamingResponse:
+    """
+    Streaming variant of /compare/batch (newline-delimited JSON).
 
+    Emits one BatchCompareItem per input product in completion order;
+    use `index` to match results to inputs.
+    """
+    async def lines() -> AsyncIterator[str]:
+        async for item in _run_batch(request.items):
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@dataclass
+class SearchResult:
+    records: List[ListingRecord]  # The `limit` cheapest relevant listings
+    timed_out: List[str]
+    failed: List[str]
+    # When the oldest cached page used stops being fresh (None if any page wasn't from the cache)
+    expires_at: Optional[float]
+
+
+async def _compare(
+    normalized: NormalizedProduct,
+    deadline: Optional[float],
+    limit: int,
+    pages: int = 1,
+) -> CompareResponse:
+    """Search all available sources for a normalized product and rank the results."""
+    return _compare_response(normalized, await _search(normalized, deadline, limit, pages))
+
+
+def _compare_response(normalized: NormalizedProduct, result: SearchResult) -> CompareResponse:
     return CompareResponse(
+        query=normalized.search_query,
+        results=_to_listings(result.records),
+        partial=bool(result.timed_out or result.failed),
+        timed_out_sources=result.timed_out,
+        failed_sources=result.failed,
+    )
+
+
+async def _search(
+    normalized: NormalizedProduct,
+    deadline: Optional[float],
+    limit: int,
+    pages: int = 1,
+) -> SearchResult:
+    """Search all available sources and rank the results."""
+    available_sources = [s for s in SEARCH_SOURCES if s.is_available()]
+
+    # Fetch from all sources in parallel, keeping whatever arrives in time,
+    # and merge each page of listings into the running top `limit`. Paging
+    # stops once a price-sorted source can't beat the current top `limit`.
+    top = TopKListings(limit)
+    fanout = SourceFanOut(
+        available_sources,
+        normalized.search_query,
+        deadline,
+        pages=pages,
+        can_stop=lambda price: not top.accepts(price),
+    )
+    expiries: List[Optional[float]] = []
+    async for _source, listings in fanout.results():
+        _add_relevant(top, listings, normalized)
+        expiries.append(listings.expires_at if isinstance(listings, ListingPage) else None)
+
+    records = _ranked(top)
+    _record_history(normalized, records)
+    expires_at = None if not expiries or None in expiries else min(expiries)
+    return SearchResult(records, fanout.timed_out, fanout.failed, expires_at)
+
+
+def _watch_sources() -> List[Source]:
+    """Uncached sources watchlist refreshes may call (quota-limited sources opt out)."""
+    return [s for s in COALESCED_SOURCES if s.is_available() and s.watch]
+
+
+async def _refresh_watched(product: WatchedProduct) -> Dict[str, List[ListingRecord]]:
+    """
+    Watchlist refreshes run without a deadline, like batch jobs, and go
+    past the search cache so every refresh sees current upstream prices.
+
+    Returns the relevant listings of each source that answered. Sources
+    that failed are left out, and the watchlist keeps their previous
+    listings; only a refresh no source answered raises.
+    """
+    normalized = product.normalized
+    sources = _watch_sources()
+    top = TopKListings(product.limit)
+    fanout = SourceFanOut(
+        sources,
+        normalized.search_query,
+        pages=product.pages,
+        can_stop=lambda price: not top.accepts(price),
+    )
+    results: Dict[str, List[ListingRecord]] = {}
+    async for source, listings in fanout.results():
+        results.setdefault(source.name, []).extend(_add_relevant(top, listings, normalized))
+
+    # A source that failed part-way has incomplete listings; keep its previous ones
+    for name in fanout.timed_out + fanout.failed:
+        results.pop(name, None)
+    if not results:
+        names = ", ".join(s.name for s in sources) or "no watchable sources"
+        raise WatchlistRefreshError(f"No source answered the refresh ({names})")
+
+    _record_history(normalized, _ranked(top))
+    return results
+
+
+WATCHLIST_SCHEDULER: Optional[WatchlistScheduler] = (
+    WatchlistScheduler(WATCHLIST, _refresh_watched, settings.WATCHLIST_CONCURRENCY)
+    if settings.WATCHLIST_ENABLED
+    else None
+)
+
+
+def _warm_sources() -> List[Source]:
+    """Cached sources that may be warmed (quota-limited sources opt out)."""
+    return [s for s in SEARCH_SOURCES if s.is_available() and s.warm_up]
+
+
+async def _warm_query(query: str) -> None:
+    """Fetch the first result page of a query from each warmable source into the search cache."""
+    sources = _warm_sources()
+    results = await asyncio.gather(*(s.search(query) for s in sources), return_exceptions=True)
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors and len(errors) == len(results):
+        raise errors[0]
+
+
+# Warming only helps when there is a search cache to fill, and an in-memory
+# cache only when this is the sole worker (each worker would warm its own copy,
+# multiplying upstream calls). A shared SQLite cache is warmed by one worker.
+_SHARED_CACHE = settings.CACHE_BACKEND == "sqlite"
+CACHE_WARMER: Optional[CacheWarmer] = (
+    CacheWarmer(
+        QUERY_LOG,
+        _warm_query,
+        settings.WARMUP_QUERIES,
+        settings.WARMUP_RATE,
+        settings.WARMUP_MAX_WAIT,
+        lock_path=settings.CACHE_PATH + ".warmup.lock" if _SHARED_CACHE else None,
+    )
+    if (
+        settings.WARMUP_ENABLED
+        and CACHED_SOURCES
+        and QUERY_LOG is not None
+        and (_SHARED_CACHE or settings.WEB_CONCURRENCY <= 1)
+        and _warm_sources()
+    )
+    else None
+)
+
+
+def _log_query(normalized: NormalizedProduct) -> None:
+    """Record an interactive query: demand for a watched product and a hit in the query log."""
+    WATCHLIST.touch_query(normalized.key)
+    if QUERY_LOG is not None:
+        QUERY_LOG.record(normalized)
+
+
+async def _run_batch(items: List[CompareRequest]) -> AsyncIterator[BatchCompareItem]:
+    """
+    Run a batch through the /compare pipeline, yielding results as they finish.
+
+    Items with the same canonical query key are searched once (with the
+    largest requested `limit` and `pages`). Batch items only get a
+    deadline if they set `deadline_seconds` explicitly, since batch jobs
+    care more about complete results than latency. Batch upstream calls
+    are rate limited in a lower-priority lane, behind interactive requests.
+    """
+    groups: Dict[str, Tuple[NormalizedProduct, List[int]]] = {}
+    for index, item in enumerate(items):
+        normalized = normalize_product(item.product_name)
+        groups.setdefault(normalized.key, (normalized, []))[1].append(index)
+
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+    async def run(normalized: NormalizedProduct, indices: List[int]) -> Tuple[List[int], CompareResponse]:
+        limit = max(items[index].limit for index in indices)
+        pages = max(items[index].pages for index in indices)
+        # The tightest deadline, unless an item asked for complete results
+        deadlines = [items[index].deadline_seconds for index in indices]
+        deadline = None if None in deadlines else min(deadlines)
+        # Set in this task's own context, so it covers only this item's searches
+        BACKGROUND.set(True)
+        async with semaphore:
+            return indices, await _compare(normalized, deadline, limit, pages)
+
+    tasks = [
+        asyncio.ensure_future(run(normalized, indices))
+        for normalized, indices in groups.values()
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            indices, response = await next_done
+            for index in indices:
+                results = response.results[:items[index].limit]
+                yield BatchCompareItem(
+                    index=index,
+                    product_name=items[index].product_name,
+                    response=response.model_copy(update={"results": results}),
+                )
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _results_etag(response: CompareResponse) -> str:
+    """Weak ETag of the ranked result set (equal results, equal tag, whatever the encoding)."""
+    body = response.model_dump_json(
+        include={"query", "results", "partial", "timed_out_sources", "failed_sources"}
+    )
+    return f'W/"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def _compare_cache_control(response: CompareResponse, expires_at: Optional[float]) -> str:
+    """Cache results for as long as the oldest cached listings they came from stay fresh."""
+    if response.partial or expires_at is None:
+        return "no-cache"  # Incomplete, or not (all) from the search cache
+    max_age = int(expires_at - time.time())
+    if max_age <= 0:
+        return "no-cache"  # Built from a stale entry being revalidated
+
+    # Results behind auth must not be stored by shared caches
+    visibility = "private" if settings.auth_enabled else "public"
+    return f"{visibility}, max-age={max_age}"
+
+
+def _deadline(request: CompareRequest) -> Optional[float]:
+    """Overall latency budget in seconds (None = wait for every source)."""
+    deadline = request.deadline_seconds or settings.COMPARE_DEADLINE
+    return deadline or None
+
+
+_FILTER_SECONDS = metrics.STAGE_SECONDS.labels("filter")
+_DEDUPE_SECONDS = metrics.STAGE_SECONDS.labels("dedupe")
+_SORT_SECONDS = metrics.STAGE_SECONDS.labels("sort")
+
+
+def _add_relevant(
+    top: TopKListings,
+    listings: List[ListingRecord],
+    normalized: NormalizedProduct,
+) -> List[ListingRecord]:
+    """Merge a source's relevant listings into the running top K and return them."""
+    with _FILTER_SECONDS.time():
+        relevant = filter_relevant(listings, normalized, settings.RELEVANCE_THRESHOLD)
+    with _DEDUPE_SECONDS.time():
+        top.extend(relevant)
+    return relevant
+
+
+def _ranked(top: TopKListings) -> List[ListingRecord]:
+    """Current top listings, cheapest first."""
+    with _SORT_SECONDS.time():
+        return top.results()
+
+
+def _record_history(normalized: NormalizedProduct, records: List[ListingRecord]) -> None:
+    if PRICE_HISTORY is not None:
+        PRICE_HISTORY.record(normalized.key, records)
+
+
+def _to_listings(records: List[ListingRecord]) -> List[Listing]:
+    """Build response models only for the listings actually returned."""
+    return [record.to_listing() for record in records]
+
+
+@app.post("/watchlist", response_model=WatchlistItem, status_code=status.HTTP_201_CREATED)
+async def add_to_watchlist(
+    request: WatchlistAddRequest,
+    _: None = Depends(verify_credentials)
+) -> WatchlistItem:
+    """
+    Watch a product. It is searched right away and then refreshed in the
+    background; read the latest results with GET /watchlist/{id}.
+
+    Adding a product that is already watched returns the existing entry.
+    """
+    normalized = normalize_product(request.product_name)
+    try:
+        product = WATCHLIST.add(request.product_name, normalized, request.limit, request.pages)
+    except WatchlistFullError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    if WATCHLIST_SCHEDULER is not None:
+        WATCHLIST_SCHEDULER.wake()
+    return _watchlist_item(product)
+
+
+@app.get("/watchlist", response_model=List[WatchlistItem])
+async def list_watchlist(_: None = Depends(verify_credentials)) -> List[WatchlistItem]:
+    """List watched products and their refresh schedule."""
+    return [_watchlist_item(product) for product in WATCHLIST.products()]
+
+
+@app.get("/watchlist/{product_id}", response_model=WatchlistSnapshot)
+async def get_watched_product(
+    product_id: str,
+    _: None = Depends(verify_credentials)
+) -> WatchlistSnapshot:
+    """Latest listings for a watched product, served from memory (no upstream calls)."""
+    product = _watched_or_404(product_id)
+    WATCHLIST.touch(product_id)
+    records = sorted(product.snapshot.values(), key=lambda listing: listing.total_price)
+    return WatchlistSnapshot(product=_watchlist_item(product), results=_to_listings(records))
+
+
+@app.get("/watchlist/{product_id}/history", response_model=WatchlistHistory)
+async def get_watched_product_history(
+    product_id: str,
+    since: Optional[float] = None,
+    _: None = Depends(verify_credentials)
+) -> WatchlistHistory:
+    """Listing changes seen by refreshes, oldest first (optionally only after `since`)."""
+    product = _watched_or_404(product_id)
+    deltas = [
+        delta.to_delta() for delta in product.history
+        if since is None or delta.timestamp > since
+    ]
+    return WatchlistHistory(product=_watchlist_item(product), deltas=deltas)
+
+
+@app.delete("/watchlist/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_from_watchlist(
+    product_id: str,
+    _: None = Depends(verify_credentials)
+) -> Response:
+    """Stop watching a product and drop its history."""
+    if not WATCHLIST.remove(product_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product is not watched")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+def _watched_or_404(product_id: str) -> WatchedProduct:
+    product = WATCHLIST.get(product_id)
+    if product is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product is not watched")
+    return product
+
+
+def _watchlist_item(product: WatchedProduct) -> WatchlistItem:
+    return WatchlistItem(
+        id=product.id,
+        product_name=product.product_name,
+        query=product.normalized.search_query,
+        limit=product.limit,
+        pages=product.pages,
+        added_at=product.added_at,
+        refreshed_at=product.refreshed_at,
+        next_refresh_at=product.next_refresh_at,
+        refresh_count=product.refresh_count,
+        volatility=round(product.volatility, 4),
+        demand=round(product.current_demand(time.time()), 4),
+    )
+
+
+@app.get("/history/stats", response_model=PriceHistoryStats)
+async def price_history_stats(
+    product_name: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    percentiles: List[float] = Query([10.0, 90.0]),
+    source: Optional[str] = None,
+    condition: Optional[str] = None,
+    _: None = Depends(verify_credentials)
+) -> PriceHistoryStats:
+    """
+    Min/median/percentile total prices recorded for a product.
+
+    `since`/`until` bound the window (unix times, default all history);
+    `percentiles` may be repeated (?percentiles=5&percentiles=95).
+    """
+    if any(not 0 <= p <= 100 for p in percentiles):
+        raise HTTPException(status_code=422, detail="percentiles must be between 0 and 100")
+
+    normalized = normalize_product(product_name)
+    query = normalized.search_query
+    # Flushing and aggregating read and write files; keep them off the event loop
+    stats = await asyncio.to_thread(
+        _history().stats, normalized.key, since, until, percentiles, source, condition
+    )
+    if stats is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No price history in this window")
+
+    return PriceHistoryStats(
         query=query,
-        results=top_listings,
+        since=since,
+        until=until,
+        count=stats.count,
+        min_price=stats.min,
+        max_price=stats.max,
+        mean_price=stats.mean,
+        median_price=stats.median,
+        percentiles={f"p{p:g}": value for p, value in stats.percentiles.items()},
     )
 
 
+@app.get("/history/low", response_model=HistoricalLow)
+async def historical_low(
+    product_name: str,
+    source: Optional[str] = None,
+    condition: Optional[str] = None,
+    _: None = Depends(verify_credentials)
+) -> HistoricalLow:
+    """Cheapest total price ever recorded for a product."""
+    normalized = normalize_product(product_name)
+    low = await asyncio.to_thread(_history().lowest, normalized.key, source, condition)
+    if low is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No price history for this product")
+    return HistoricalLow(query=normalized.search_query, low=low.to_point())
+
+
+def _history() -> PriceHistory:
+    if PRICE_HISTORY is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Price history is disabled")
+    return PRICE_HISTORY
+
+
 @app.get("/health")
 async def health_check(_: None = Depends(verify_credentials)) -> dict:
     """Health check endpoint."""
@@ -113,11 +757,71 @@ async def health_check(_: None = Depends(verify_credentials)) -> dict:
     return {
         "status": "healthy",
         "available_sources": available_sources,
+        "cache": await _cache_stats(),
+        "coalescing": {s.name: s.stats() for s in COALESCED_SOURCES},
+        "circuit_breakers": {s.name: s.stats() for s in GUARDED_SOURCES},
+        "rate_limits": {s.name: s.stats() for s in RATE_LIMITED_SOURCES},
+        "hedging": {s.name: s.stats() for s in HEDGED_SOURCES},
+        "watchlist": _watchlist_stats(),
+        "history": await _history_stats(),
+        "warmup": _warmup_stats(),
+    }
+
+
+@app.get("/ready")
+async def readiness_check() -> JSONResponse:
+    """
+    Readiness probe: 503 until the startup cache warm-up is finished (or
+    WARMUP_MAX_WAIT has passed), then 200. No auth, so platform probes can
+    reach it; it only reports warm-up progress counts.
+    """
+    ready = CACHE_WARMER is None or CACHE_WARMER.ready(time.time())
+    return JSONResponse(
+        {"ready": ready, "warmup": _warmup_stats()},
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+async def _cache_stats() -> dict:
+    """Cache size plus hit/miss counters per source."""
+    if not settings.CACHE_ENABLED:
+        return {"enabled": False}
+
+    # The SQLite backend queries the database; keep that off the event loop
+    return {
+        "enabled": True,
+        **await asyncio.to_thread(LISTING_CACHE.stats),
+        "sources": {s.name: s.stats() for s in CACHED_SOURCES},
     }
 
 
+async def _history_stats() -> dict:
+    if PRICE_HISTORY is None:
+        return {"enabled": False}
+    return {"enabled": True, **await asyncio.to_thread(PRICE_HISTORY.summary)}
+
+
+def _warmup_stats() -> dict:
+    if CACHE_WARMER is None:
+        return {"enabled": False}
+    return {"enabled": True, **CACHE_WARMER.stats()}
+
+
+def _watchlist_stats() -> dict:
+    if WATCHLIST_SCHEDULER is None:
+        return {"enabled": False, "products": len(WATCHLIST)}
+    return {"enabled": True, **WATCHLIST_SCHEDULER.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint(_: None = Depends(verify_credentials)) -> PlainTextResponse:
+    """Prometheus text-format metrics (per-stage timings, per-source counters)."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
-async def serve_frontend(_: None = Depends(verify_credentials)) -> FileResponse:
-    """Serve the frontend HTML page."""
-    html_path = Path(__file__).parent.parent / "index.html"
-    return FileResponse(html_path)
+async def serve_frontend(request: Request, _: None = Depends(verify_credentials)) -> Response:
+    """Serve the frontend HTML page from memory (304 if the client's copy is current)."""
+    # Pages behind auth must not be stored by shared caches
+    visibility = "private" if settings.auth_enabled else "public"
+    return FRONTEND.response(request.headers, f"{visibility}, max-age={settings.FRONTEND_MAX_AGE}")
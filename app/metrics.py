@@ -0,0 +1,213 @@
+import bisect
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Bucket upper bounds in seconds. In-process stages take microseconds,
+# upstream calls take up to the source timeouts.
+STAGE_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0,
+)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0)
+
+
+class Metric(ABC):
+    """Base class for a metric family with a fixed set of label names."""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """Child metric for one label combination (created on first use)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """Create the value holder for one label combination."""
+        pass
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(_label_pairs(self.labelnames, values), child))
+        return lines
+
+    @abstractmethod
+    def _render_child(self, labels: List[str], child) -> List[str]:
+        """Exposition lines for one label combination."""
+        pass
+
+
+class _CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    type = "counter"
+
+    def _new_child(self) -> _CounterValue:
+        return _CounterValue()
+
+    def _render_child(self, labels: List[str], child: _CounterValue) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(child.value)}"]
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(Metric):
+    """Distribution of observed values in fixed buckets (e.g. durations in seconds)."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def _render_child(self, labels: List[str], child: _HistogramValue) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float("inf")), child.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else _format_value(bound)
+            bucket_labels = _format_labels([*labels, 'le="%s"' % le])
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _label_pairs(names: Tuple[str, ...], values: Tuple[str, ...]) -> List[str]:
+    return [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+
+
+def _format_labels(pairs: List[str]) -> str:
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY = Registry()
+
+# Per-stage timings of the /compare pipeline (normalize, filter, dedupe, sort)
+STAGE_SECONDS: Histogram = REGISTRY.register(Histogram(
+    "price_compare_stage_seconds",
+    "Time spent in each in-process stage of a comparison",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+))
+
+# Per-source search latency as seen by the fan-out (includes cache hits)
+SOURCE_SEARCH_SECONDS: Histogram = REGISTRY.register(Histogram(
+    "price_compare_source_search_seconds",
+    "Time for one page of Source.search, including cache hits",
+    ["source"],
+))
+
+# Upstream HTTP calls split into connect (new connections only), upstream and parse
+SOURCE_STAGE_SECONDS: Histogram = REGISTRY.register(Histogram(
+    "price_compare_source_stage_seconds",
+    "Upstream request time split into connect, upstream (request/response) and parse",
+    ["source", "stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0),
+))
+
+SOURCE_LISTINGS: Counter = REGISTRY.register(Counter(
+    "price_compare_source_listings_total",
+    "Listings returned by each source",
+    ["source"],
+))
+
+SOURCE_ERRORS: Counter = REGISTRY.register(Counter(
+    "price_compare_source_errors_total",
+    "Failed source searches, by error type",
+    ["source", "error"],
+))
+
+SOURCE_TIMEOUTS: Counter = REGISTRY.register(Counter(
+    "price_compare_source_timeouts_total",
+    "Sources cancelled because a comparison reached its deadline",
+    ["source"],
+))
+
+SOURCE_HEDGES: Counter = REGISTRY.register(Counter(
+    "price_compare_source_hedges_total",
+    "Hedged upstream requests: fired, won (hedge answered first), over_budget (skipped)",
+    ["source", "outcome"],
+))
+
+REQUEST_SECONDS: Histogram = REGISTRY.register(Histogram(
+    "price_compare_request_seconds",
+    "End-to-end comparison latency per endpoint",
+    ["endpoint"],
+))
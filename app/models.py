@@ -1,4 +1,5 @@
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -6,6 +7,14 @@ from pydantic import BaseModel, Field
 class CompareRequest(BaseModel):
     product_name: str = Field(..., description="Product name to search for")
     product_url: Optional[str] = Field(None, description="Optional product URL for reference")
+    deadline_seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        le=60,
+        description="Overall latency budget; sources that miss it are skipped (defaults to COMPARE_DEADLINE)",
+    )
+    limit: int = Field(10, ge=1, le=100, description="Maximum number of listings to return")
+    pages: int = Field(1, ge=1, le=5, description="Result pages to fetch per source (deeper search, more upstream calls)")
 
 
 class Listing(BaseModel):
@@ -15,6 +24,7 @@ class Listing(BaseModel):
     total_price: float = Field(..., description="Total price (item + shipping)")
     condition: str = Field(..., description="Item condition: new, used, refurbished, or unknown")
     url: str = Field(..., description="Purchase URL")
+    title: Optional[str] = Field(None, description="Listing title as shown by the source")
 
     @classmethod
     def create(
@@ -24,6 +34,7 @@ class Listing(BaseModel):
         shipping: float,
         condition: str,
         url: str,
+        title: Optional[str] = None,
     ) -> "Listing":
         return cls(
             source=source,
@@ -32,9 +43,175 @@ class Listing(BaseModel):
             total_price=round(price + shipping, 2),
             condition=condition,
             url=url,
+            title=title,
         )
 
 
+@dataclass(frozen=True, slots=True)
+class ListingRecord:
+    """
+    Lightweight internal listing used by sources, caching, dedup and ranking.
+
+    Sources return many listings that are filtered out or never make the
+    top K, so the Pydantic `Listing` is only built (via `to_listing()`) for
+    listings actually returned to the client.
+    """
+
+    source: str
+    price: float
+    shipping: float
+    total_price: float
+    condition: str
+    url: str
+    title: Optional[str] = None
+
+    @classmethod
+    def create(
+        cls,
+        source: str,
+        price: float,
+        shipping: float,
+        condition: str,
+        url: str,
+        title: Optional[str] = None,
+    ) -> "ListingRecord":
+        return cls(source, price, shipping, round(price + shipping, 2), condition, url, title)
+
+    def to_listing(self) -> Listing:
+        return Listing(
+            source=self.source,
+            price=self.price,
+            shipping=self.shipping,
+            total_price=self.total_price,
+            condition=self.condition,
+            url=self.url,
+            title=self.title,
+        )
+
+
+class ListingPage(List[ListingRecord]):
+    """
+    One page of a source's listings, plus whether the upstream has more.
+
+    `more` is decided from the raw upstream page (its item count, or the
+    upstream's own page count), since parsing drops unusable items and a
+    short parsed page doesn't mean the results ran out. Pages served by
+    the search cache also carry `expires_at`, when they stop being fresh.
+    """
+
+    __slots__ = ("more", "expires_at")
+
+    def __init__(
+        self,
+        listings: Iterable[ListingRecord] = (),
+        more: bool = False,
+        expires_at: Optional[float] = None,
+    ):
+        super().__init__(listings)
+        self.more = more
+        self.expires_at = expires_at
+
+    def copy(self) -> "ListingPage":
+        return ListingPage(self, self.more, self.expires_at)
+
+
+def has_more_pages(listings: List[ListingRecord], page_size: int) -> bool:
+    """Whether a source may have results past this page (a full page, for plain lists)."""
+    if isinstance(listings, ListingPage):
+        return listings.more
+    return len(listings) >= page_size
+
+
 class CompareResponse(BaseModel):
     query: str = Field(..., description="Normalized search query used")
     results: List[Listing] = Field(default_factory=list, description="Sorted listings (cheapest first)")
+    partial: bool = Field(False, description="True if some sources missed the deadline or failed")
+    timed_out_sources: List[str] = Field(default_factory=list, description="Sources cancelled at the deadline")
+    failed_sources: List[str] = Field(default_factory=list, description="Sources whose search failed (errors, open circuit)")
+
+
+class CompareStreamEvent(BaseModel):
+    event: str = Field(..., description="'update' after each source finishes, 'done' at the end")
+    source: Optional[str] = Field(None, description="Source that just finished (update events only)")
+    query: str = Field(..., description="Normalized search query used")
+    results: List[Listing] = Field(default_factory=list, description="Current top listings (cheapest first)")
+    partial: bool = Field(False, description="True if some sources missed the deadline or failed (done event only)")
+    timed_out_sources: List[str] = Field(default_factory=list, description="Sources cancelled at the deadline")
+    failed_sources: List[str] = Field(default_factory=list, description="Sources whose search failed (errors, open circuit)")
+
+
+class BatchCompareRequest(BaseModel):
+    items: List[CompareRequest] = Field(..., min_length=1, max_length=5000, description="Products to compare")
+
+
+class BatchCompareItem(BaseModel):
+    index: int = Field(..., description="Position of the product in the request's items list")
+    product_name: str = Field(..., description="Product name as submitted")
+    response: CompareResponse = Field(..., description="Comparison result for this product")
+
+
+class BatchCompareResponse(BaseModel):
+    results: List[BatchCompareItem] = Field(default_factory=list, description="One result per input item, in input order")
+
+
+class WatchlistAddRequest(BaseModel):
+    product_name: str = Field(..., description="Product name to watch")
+    limit: int = Field(10, ge=1, le=100, description="Cheapest listings kept per refresh")
+    pages: int = Field(1, ge=1, le=5, description="Result pages to fetch per source on each refresh")
+
+
+class WatchlistItem(BaseModel):
+    id: str = Field(..., description="Watched product ID")
+    product_name: str = Field(..., description="Product name as submitted")
+    query: str = Field(..., description="Normalized search query used")
+    limit: int = Field(..., description="Cheapest listings kept per refresh")
+    pages: int = Field(..., description="Result pages fetched per source")
+    added_at: float = Field(..., description="Unix time the product was added")
+    refreshed_at: Optional[float] = Field(None, description="Unix time of the last refresh (null until the first one)")
+    next_refresh_at: float = Field(..., description="Unix time the next refresh is due")
+    refresh_count: int = Field(0, description="Completed refreshes")
+    volatility: float = Field(0.0, description="Recent share of listings changing per refresh (0-1)")
+    demand: float = Field(0.0, description="Recent reads, decaying over time")
+
+
+class WatchlistSnapshot(BaseModel):
+    product: WatchlistItem = Field(..., description="Watched product")
+    results: List[Listing] = Field(default_factory=list, description="Listings from the last refresh (cheapest first)")
+
+
+class PriceDelta(BaseModel):
+    timestamp: float = Field(..., description="Unix time of the refresh that saw the change")
+    change: str = Field(..., description="added, removed, or changed (total price moved)")
+    listing: Listing = Field(..., description="New listing (last seen listing if removed)")
+    previous_total_price: Optional[float] = Field(None, description="Total price before the change")
+
+
+class WatchlistHistory(BaseModel):
+    product: WatchlistItem = Field(..., description="Watched product")
+    deltas: List[PriceDelta] = Field(default_factory=list, description="Listing changes, oldest first")
+
+
+class PricePoint(BaseModel):
+    timestamp: float = Field(..., description="Unix time the price was recorded")
+    total_price: float = Field(..., description="Total price (item + shipping)")
+    price: float = Field(..., description="Item price in USD")
+    shipping: float = Field(..., description="Shipping cost in USD")
+    source: str = Field(..., description="Source marketplace")
+    condition: str = Field(..., description="Item condition")
+
+
+class PriceHistoryStats(BaseModel):
+    query: str = Field(..., description="Normalized search query")
+    since: Optional[float] = Field(None, description="Window start (unix time, inclusive)")
+    until: Optional[float] = Field(None, description="Window end (unix time, inclusive)")
+    count: int = Field(..., description="Recorded listing prices in the window")
+    min_price: float = Field(..., description="Lowest total price in the window")
+    max_price: float = Field(..., description="Highest total price in the window")
+    mean_price: float = Field(..., description="Mean total price in the window")
+    median_price: float = Field(..., description="Median total price in the window")
+    percentiles: Dict[str, float] = Field(default_factory=dict, description="Requested total-price percentiles, keyed 'p<N>'")
+
+
+class HistoricalLow(BaseModel):
+    query: str = Field(..., description="Normalized search query")
+    low: PricePoint = Field(..., description="Cheapest total price ever recorded")
@@ -1,6 +1,12 @@
 import re
+import time
 from dataclasses import dataclass
-from typing import Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from app import metrics
+from config import settings
 
 
 # Common electronics/consumer brands
@@ -18,11 +24,92 @@ KNOWN_BRANDS = {
 }
 
 
-@dataclass
+# Model number patterns, tried in order (alphanumeric patterns like XM5, WH-1000XM5, A2234, etc.)
+MODEL_PATTERNS = [
+    re.compile(r"\b([A-Z]{1,3}[-]?\d{2,4}[A-Z]{0,3}\d{0,2})\b", re.IGNORECASE),  # WH-1000XM5, XM5, A2234
+    re.compile(r"\b(\d{2,4}[A-Z]{1,3})\b", re.IGNORECASE),  # 1000XM, 65C1
+    re.compile(r"\b([A-Z]+\d+[A-Z]*\d*)\b", re.IGNORECASE),  # AirPods3, Galaxy22
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Words that never tell two products apart; left out of query keys
+FILLER_WORDS = {
+    "a", "an", "the", "and", "or", "for", "with", "of", "in",
+    "buy", "cheap", "cheapest", "best", "price", "prices", "deal", "deals", "sale",
+}
+
+# Word tokens for query keys (any script, hyphens removed beforehand)
+_KEY_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+class BrandMatcher:
+    """
+    Finds the known brand mentioned in a product name.
+
+    Brands are indexed by their word-token sequence, so a lookup costs one
+    dict probe per (position, length) pair no matter how many brands are
+    known. When several brands match, the one with the most tokens wins
+    ("instant pot" over "instant"), then the longer name, then the earliest.
+    """
+
+    def __init__(self, brands: Iterable[str]):
+        self._brands: Dict[Tuple[str, ...], str] = {}
+        self._max_tokens = 0
+
+        # Sort so the stored spelling is deterministic when two brands tokenize alike
+        for brand in sorted(brands):
+            tokens = tuple(_TOKEN_RE.findall(brand.lower()))
+            if not tokens:
+                continue
+            self._brands.setdefault(tokens, brand.lower())
+            self._max_tokens = max(self._max_tokens, len(tokens))
+
+    def __len__(self) -> int:
+        return len(self._brands)
+
+    def find(self, text: str) -> Optional[str]:
+        """Return the best matching brand (lowercase), or None."""
+        tokens = _TOKEN_RE.findall(text.lower())
+        best: Optional[str] = None
+        best_rank = (0, 0)
+
+        for start in range(len(tokens)):
+            longest = min(self._max_tokens, len(tokens) - start)
+            for length in range(longest, 0, -1):
+                brand = self._brands.get(tuple(tokens[start:start + length]))
+                if brand is None:
+                    continue
+                rank = (length, len(brand))
+                if rank > best_rank:
+                    best, best_rank = brand, rank
+                break  # Longest match at this position found
+
+        return best
+
+
+def load_brands(path: str) -> Set[str]:
+    """Load extra brands from a text file (one per line, '#' starts a comment)."""
+    brands = set()
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        brand = line.split("#", 1)[0].strip().lower()
+        if brand:
+            brands.add(brand)
+    return brands
+
+
+BRAND_MATCHER = BrandMatcher(
+    KNOWN_BRANDS | load_brands(settings.BRANDS_FILE) if settings.BRANDS_FILE else KNOWN_BRANDS
+)
+
+
+@dataclass(frozen=True, slots=True)
 class NormalizedProduct:
     brand: Optional[str]
     model: Optional[str]
     full_query: str
+    # Canonical form of the query: equivalent product names share it
+    key: str
 
     @property
     def search_query(self) -> str:
@@ -35,29 +122,33 @@ def normalize_product(product_name: str) -> NormalizedProduct:
     Extract brand and model from product name.
     Returns normalized product info for API searches.
     """
-    # Clean up the input
-    cleaned = product_name.strip()
-    cleaned_lower = cleaned.lower()
+    # Clean up the input; results are memoized on the cleaned string
+    started = time.perf_counter()
+    normalized = _normalize_cleaned(product_name.strip())
+    _NORMALIZE_SECONDS.observe(time.perf_counter() - started)
+    return normalized
 
+
+def query_key(product_name: str) -> str:
+    """Canonical key for a product name (NormalizedProduct.key), for cache and coalescing keys."""
+    return _normalize_cleaned(product_name.strip()).key
+
+
+_NORMALIZE_SECONDS = metrics.STAGE_SECONDS.labels("normalize")
+
+
+@lru_cache(maxsize=settings.NORMALIZE_CACHE_SIZE)
+def _normalize_cleaned(cleaned: str) -> NormalizedProduct:
+    """Normalize an already-stripped product name (memoized, results are immutable)."""
     # Try to find a known brand
-    brand = None
-    for known_brand in KNOWN_BRANDS:
-        # Match brand at word boundary
-        pattern = rf"\b{re.escape(known_brand)}\b"
-        if re.search(pattern, cleaned_lower):
-            brand = known_brand.title()
-            break
+    brand = BRAND_MATCHER.find(cleaned)
+    if brand:
+        brand = brand.title()
 
-    # Try to extract model number (alphanumeric patterns like XM5, WH-1000XM5, A2234, etc.)
+    # Try to extract model number
     model = None
-    model_patterns = [
-        r"\b([A-Z]{1,3}[-]?\d{2,4}[A-Z]{0,3}\d{0,2})\b",  # WH-1000XM5, XM5, A2234
-        r"\b(\d{2,4}[A-Z]{1,3})\b",  # 1000XM, 65C1
-        r"\b([A-Z]+\d+[A-Z]*\d*)\b",  # AirPods3, Galaxy22
-    ]
-
-    for pattern in model_patterns:
-        match = re.search(pattern, cleaned, re.IGNORECASE)
+    for pattern in MODEL_PATTERNS:
+        match = pattern.search(cleaned)
         if match:
             model = match.group(1).upper()
             break
@@ -66,9 +157,30 @@ def normalize_product(product_name: str) -> NormalizedProduct:
         brand=brand,
         model=model,
         full_query=cleaned,
+        key=_query_key(cleaned, brand, model),
     )
 
 
+def _query_key(cleaned: str, brand: Optional[str], model: Optional[str]) -> str:
+    """
+    Case-folded, hyphen-insensitive, order-independent key built around
+    the brand and model, so "Sony WH-1000XM5", "sony wh1000xm5" and
+    "WH-1000XM5 Sony" all become "sony wh1000xm5". Product-type words
+    stay in the key: "PS5 console" and "PS5 controller" are different
+    products even though they share a model number.
+    """
+    tokens = set(_KEY_TOKEN_RE.findall(cleaned.casefold().replace("-", "")))
+    words = tokens - FILLER_WORDS
+    if brand:
+        # Multi-word brands become one token ("audio technica" -> "audiotechnica")
+        brand_tokens = _KEY_TOKEN_RE.findall(brand.casefold().replace("-", " "))
+        words.difference_update(brand_tokens)
+        words.add("".join(brand_tokens))
+
+    # A query made only of filler words keys on all of them
+    return " ".join(sorted(words or tokens))
+
+
 def matches_product(listing_title: str, normalized: NormalizedProduct) -> bool:
     """
     Check if a listing title matches the normalized product.
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from contextvars import ContextVar
+
+# True while running background work (batch comparisons): its upstream calls
+# only take rate-limit tokens that no interactive request is waiting for
+BACKGROUND: ContextVar[bool] = ContextVar("background", default=False)
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter with adaptive rate.
+
+    Allows bursts of up to `capacity` calls and a sustained `rate` calls
+    per second. Callers wait (in arrival order) until a token is available.
+    Background callers have a lane of their own: they only get a token
+    while no foreground caller is waiting, so a long batch can't queue
+    ahead of live requests. When upstream throttles us, `slow_down()`
+    halves the rate; each successful call lets it climb back towards the
+    configured `max_rate`.
+    """
+
+    # Never slow down below this fraction of the configured rate
+    MIN_RATE_FRACTION = 1 / 16
+    # Fraction of the configured rate regained per successful call
+    RECOVERY_STEP = 0.1
+
+    def __init__(self, rate: float, capacity: float):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._background_lock = asyncio.Lock()
+        self._foreground_waiting = 0
+
+    async def acquire(self, background: bool = False) -> None:
+        if background:
+            async with self._background_lock:
+                await self._take(background=True)
+            return
+
+        self._foreground_waiting += 1
+        try:
+            async with self._lock:
+                await self._take(background=False)
+        finally:
+            self._foreground_waiting -= 1
+
+    async def _take(self, background: bool) -> None:
+        while True:
+            self._refill()
+            if self._tokens >= 1 and not (background and self._foreground_waiting):
+                self._tokens -= 1
+                return
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+            else:
+                await asyncio.sleep(1 / self.rate)  # Leave this token to the waiting foreground caller
+
+    def slow_down(self) -> None:
+        """Multiplicative decrease after the upstream throttled us."""
+        self._refill()
+        self.rate = max(self.max_rate * self.MIN_RATE_FRACTION, self.rate / 2)
+
+    def speed_up(self) -> None:
+        """Additive increase back towards the configured rate."""
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + self.max_rate * self.RECOVERY_STEP)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
@@ -0,0 +1,112 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional
+
+from app.models import ListingRecord
+from app.normalizer import NormalizedProduct
+
+# Words that mark a listing as an accessory for the product rather than the product
+ACCESSORY_TERMS = [
+    "case", "cover", "sleeve", "skin", "decal", "sticker", "screen protector",
+    "ear pads", "earpads", "ear cushions", "replacement", "cable", "cord",
+    "charger", "adapter", "stand", "mount", "holder", "strap", "bag", "box only",
+    "for parts", "compatible with", "remote",
+]
+_ACCESSORY_ALTERNATION = "|".join(re.escape(t) for t in ACCESSORY_TERMS)
+_ACCESSORY_RE = re.compile(r"\b(?:" + _ACCESSORY_ALTERNATION + r")\b")
+
+# Accessories bundled with the product ("... Headphones with Carrying Case",
+# "includes USB-C cable") describe the box contents, not the item being sold
+_INCLUDED_ITEM = r"(?:[\w-]+\s+){0,3}?(?:" + _ACCESSORY_ALTERNATION + r")\b"
+_INCLUDED_ACCESSORY_RE = re.compile(
+    r"(?:\b(?:with|includes?|including|plus)\b|\bw/|\+)\s*" + _INCLUDED_ITEM
+    + r"(?:\s*(?:,|&|\band\b)\s*" + _INCLUDED_ITEM + r")*"
+)
+
+# Score multiplier for accessory listings when the query isn't for an accessory
+ACCESSORY_PENALTY = 0.5
+
+
+@dataclass(frozen=True, slots=True)
+class RelevanceScorer:
+    """
+    Precomputed tokens for scoring listing titles against one product.
+
+    The score is the fraction of the product's brand/model found in the
+    title (1.0 when the product has neither), halved for accessory
+    listings unless the query itself asks for an accessory. Brands and
+    models match with or without hyphens ("Audio Technica" for
+    "audio-technica").
+    """
+
+    brand: Optional[str]
+    brand_spaced: Optional[str]
+    brand_compact: Optional[str]
+    model: Optional[str]
+    model_compact: Optional[str]
+    query_is_accessory: bool
+
+    def score(self, title: Optional[str]) -> float:
+        # Nothing to judge: keep listings from sources that don't expose titles
+        if not title:
+            return 1.0
+
+        title_lower = title.lower()
+        title_compact = title_lower.replace("-", "")
+        required = 0
+        matched = 0
+
+        if self.model:
+            required += 1
+            if self.model in title_lower or self.model_compact in title_compact:
+                matched += 1
+
+        if self.brand:
+            required += 1
+            if (
+                self.brand in title_lower
+                or self.brand_spaced in title_lower.replace("-", " ")
+                or self.brand_compact in title_compact
+            ):
+                matched += 1
+
+        score = matched / required if required else 1.0
+
+        if not self.query_is_accessory and _is_accessory(title_lower):
+            score *= ACCESSORY_PENALTY
+
+        return score
+
+
+@lru_cache(maxsize=1024)
+def relevance_scorer(normalized: NormalizedProduct) -> RelevanceScorer:
+    """Build (once per product) the lowercased, hyphen-stripped match tokens."""
+    model = normalized.model.lower() if normalized.model else None
+    brand = normalized.brand.lower() if normalized.brand else None
+    return RelevanceScorer(
+        brand=brand,
+        brand_spaced=brand.replace("-", " ") if brand else None,
+        brand_compact=brand.replace("-", "").replace(" ", "") if brand else None,
+        model=model,
+        model_compact=model.replace("-", "") if model else None,
+        query_is_accessory=bool(_ACCESSORY_RE.search(normalized.full_query.lower())),
+    )
+
+
+def _is_accessory(title_lower: str) -> bool:
+    """Whether the listing is an accessory, ignoring accessories bundled with the product."""
+    return bool(_ACCESSORY_RE.search(_INCLUDED_ACCESSORY_RE.sub(" ", title_lower)))
+
+
+def filter_relevant(
+    listings: List[ListingRecord],
+    normalized: NormalizedProduct,
+    threshold: float,
+) -> List[ListingRecord]:
+    """Drop listings whose title scores below `threshold` for the product."""
+    if threshold <= 0:
+        return listings
+
+    score = relevance_scorer(normalized).score
+    return [listing for listing in listings if score(listing.title) >= threshold]
@@ -1,7 +1,28 @@
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, Callable, Dict, List, Optional
 
-from app.models import Listing
+import httpx
+
+from app import fastjson, metrics
+from app.http_client import ConnectTrace
+from app.models import ListingRecord
+from config import settings
+
+
+class SourceError(Exception):
+    """Raised when a source's upstream request fails."""
+    pass
+
+
+class SourceThrottledError(SourceError):
+    """Raised when the upstream rejects a request for rate limiting (HTTP 429)."""
+    pass
+
+
+class SourceUnavailableError(SourceError):
+    """Raised without calling upstream, e.g. while the source's circuit is open."""
+    pass
 
 
 class Source(ABC):
@@ -18,15 +39,163 @@ class Source(ABC):
         """Check if this source is available (e.g., API key configured)."""
         pass
 
+    @property
+    def cache_ttl(self) -> float:
+        """How long (seconds) this source's search results stay fresh in the cache."""
+        return settings.CACHE_DEFAULT_TTL
+
+    @property
+    def rate_limit(self) -> float:
+        """Maximum upstream calls per second (0 = unlimited)."""
+        return 0.0
+
+    @property
+    def page_size(self) -> int:
+        """Listings requested per results page."""
+        return 20
+
+    @property
+    def sorted_by_price(self) -> bool:
+        """True if pages come back cheapest first, so later pages can't beat earlier ones."""
+        return False
+
+    @property
+    def hedge(self) -> bool:
+        """True if slow calls may be hedged with a second identical request."""
+        return False
+
+    @property
+    def warm_up(self) -> bool:
+        """True if popular queries may be pre-fetched at startup (off for tight quotas)."""
+        return True
+
+    @property
+    def watch(self) -> bool:
+        """True if watchlist refreshes may call this source (off for tight quotas)."""
+        return True
+
     @abstractmethod
-    async def search(self, query: str) -> List[Listing]:
+    async def search(self, query: str, page: int = 1) -> List[ListingRecord]:
         """
         Search for products matching the query.
 
         Args:
             query: Search query string
+            page: 1-based results page (`page_size` listings per page)
 
         Returns:
-            List of Listing objects found
+            List of ListingRecord objects found
         """
         pass
+
+
+class HttpSource(Source):
+    """
+    Base class for sources backed by an upstream HTTP API.
+
+    The shared, pooled client is injected via `bind_client()` (see the app
+    lifespan in `app/main.py`). Without one, a short-lived client is used.
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self._client = client
+
+    def bind_client(self, client: Optional[httpx.AsyncClient]) -> None:
+        """Attach (or detach, with None) the shared HTTP client."""
+        self._client = client
+
+    async def _get(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        timeout: float,
+        extensions: Optional[Dict[str, Any]] = None,
+    ) -> httpx.Response:
+        """Issue a GET request using the shared client when one is bound."""
+        if self._client is None:
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                return await client.get(url, params=params, extensions=extensions)
+
+        return await self._client.get(url, params=params, timeout=timeout, extensions=extensions)
+
+    async def _get_listings(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        timeout: float,
+        parse: Callable[[Any], List[ListingRecord]],
+    ) -> List[ListingRecord]:
+        """
+        GET a JSON document and parse it into listings, raising SourceError
+        on any failure.
+
+        Errors are surfaced rather than swallowed so rate limiting and
+        circuit breaking can react; the orchestrator skips failed sources.
+        Connect, upstream and parse times are recorded per source.
+        """
+        trace = ConnectTrace()
+        started = time.perf_counter()
+        try:
+            response = await self._get(url, params=params, timeout=timeout, extensions={"trace": trace})
+        except httpx.HTTPError as exc:
+            raise SourceError(f"{self.name}: {exc!r}") from exc
+
+        elapsed = time.perf_counter() - started
+        if trace.connect is not None:
+            metrics.SOURCE_STAGE_SECONDS.labels(self.name, "connect").observe(trace.connect)
+            elapsed -= trace.connect
+        metrics.SOURCE_STAGE_SECONDS.labels(self.name, "upstream").observe(elapsed)
+
+        if response.status_code == 429:
+            raise SourceThrottledError(f"{self.name}: rate limited by upstream")
+        if response.is_error:
+            raise SourceError(f"{self.name}: HTTP {response.status_code}")
+
+        with metrics.SOURCE_STAGE_SECONDS.labels(self.name, "parse").time():
+            try:
+                data = fastjson.loads(response.content)
+            except ValueError as exc:
+                raise SourceError(f"{self.name}: invalid JSON response") from exc
+            return parse(data)
+
+
+class SourceWrapper(Source):
+    """Base class for sources that add behaviour around another source."""
+
+    def __init__(self, source: Source):
+        self.source = source
+
+    @property
+    def name(self) -> str:
+        return self.source.name
+
+    @property
+    def cache_ttl(self) -> float:
+        return self.source.cache_ttl
+
+    @property
+    def rate_limit(self) -> float:
+        return self.source.rate_limit
+
+    @property
+    def page_size(self) -> int:
+        return self.source.page_size
+
+    @property
+    def sorted_by_price(self) -> bool:
+        return self.source.sorted_by_price
+
+    @property
+    def hedge(self) -> bool:
+        return self.source.hedge
+
+    @property
+    def warm_up(self) -> bool:
+        return self.source.warm_up
+
+    @property
+    def watch(self) -> bool:
+        return self.source.watch
+
+    def is_available(self) -> bool:
+        return self.source.is_available()
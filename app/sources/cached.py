@@ -0,0 +1,93 @@
+import asyncio
+import time
+from typing import Dict, List
+
+from app.cache import CacheBackend
+from app.models import ListingPage, ListingRecord, has_more_pages
+from app.normalizer import query_key
+from app.singleflight import SingleFlight
+from app.sources.base import Source, SourceWrapper
+from config import settings
+
+
+class CachedSource(SourceWrapper):
+    """
+    Caching wrapper around another source.
+
+    Entries are keyed on the canonical query key, so equivalent product
+    names share them. Fresh entries are returned directly. Stale entries
+    are returned immediately while a background task refreshes them
+    (stale-while-revalidate). Misses for the same key share one fetch,
+    and the fetch stores its result even if every caller gave up (e.g. at
+    the comparison deadline), so the upstream call isn't wasted.
+
+    Results are returned as a ListingPage stamped with when the entry
+    stops being fresh (already past for a stale entry).
+    """
+
+    def __init__(self, source: Source, cache: CacheBackend):
+        super().__init__(source)
+        self._cache = cache
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    async def search(self, query: str, page: int = 1) -> ListingPage:
+        key = self._cache_key(query, page)
+        entry = await self._cache.aget(key)
+
+        if entry is not None:
+            if entry.is_fresh(time.time()):
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._schedule_refresh(key, query, page)
+            return self._served(entry.listings, entry.expires_at)
+
+        self.misses += 1
+        return await self._fetch(key, query, page)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+        }
+
+    def _cache_key(self, query: str, page: int) -> str:
+        # Equivalent queries share an entry; the first one's text is sent upstream
+        key = f"{self.name}:{query_key(query)}"
+        return key if page == 1 else f"{key}#p{page}"
+
+    async def _fetch(self, key: str, query: str, page: int) -> ListingPage:
+        listings = await self._flight.do(key, lambda: self._fetch_and_store(key, query, page))
+        return listings.copy()
+
+    async def _fetch_and_store(self, key: str, query: str, page: int) -> ListingPage:
+        # Runs as the shared task, so the write happens even if the waiters were cancelled.
+        # Failures raise, so they are never cached; empty results are
+        listings = await self.source.search(query, page)
+        expires_at = time.time() + self.cache_ttl
+        await self._cache.aset(key, listings, self.cache_ttl, settings.CACHE_STALE_TTL)
+        return self._served(listings, expires_at)
+
+    def _served(self, listings: List[ListingRecord], expires_at: float) -> ListingPage:
+        """A caller's own copy of a cached page, stamped with its freshness."""
+        return ListingPage(listings, has_more_pages(listings, self.page_size), expires_at)
+
+    async def _refresh(self, key: str, query: str, page: int) -> None:
+        try:
+            await self._fetch(key, query, page)
+        except Exception:
+            # Keep serving the stale entry; the next request will retry
+            pass
+
+    def _schedule_refresh(self, key: str, query: str, page: int) -> None:
+        if key in self._refreshing:
+            return
+
+        task = asyncio.create_task(self._refresh(key, query, page))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
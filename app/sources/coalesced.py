@@ -0,0 +1,32 @@
+from typing import Dict, List
+
+from app.models import ListingRecord
+from app.normalizer import query_key
+from app.singleflight import SingleFlight
+from app.sources.base import Source, SourceWrapper
+
+
+class CoalescedSource(SourceWrapper):
+    """
+    Single-flight wrapper around another source.
+
+    Concurrent searches for the same query (or an equivalent one with the
+    same canonical key) share one upstream request, so a burst of
+    identical /compare calls costs a single API call.
+    """
+
+    def __init__(self, source: Source):
+        super().__init__(source)
+        self._flight = SingleFlight()
+
+    async def search(self, query: str, page: int = 1) -> List[ListingRecord]:
+        key = f"{query_key(query)}#p{page}"
+        listings = await self._flight.do(key, lambda: self.source.search(query, page))
+        # Each caller gets its own list so results can be extended safely
+        return listings.copy()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "coalesced": self._flight.coalesced,
+            "in_flight": self._flight.in_flight(),
+        }
@@ -1,9 +1,8 @@
 from typing import List, Optional
 
-import httpx
-
-from app.models import Listing
-from app.sources.base import Source
+from app.fastjson import compile_path
+from app.models import ListingPage, ListingRecord
+from app.sources.base import HttpSource
 from config import settings
 
 
@@ -25,11 +24,20 @@ CONDITION_MAP = {
     "7000": "used",  # For parts
 }
 
+# Precompiled extractors for the Finding API JSON, which wraps every scalar in a list
+_ITEMS = compile_path("findItemsByKeywordsResponse", 0, "searchResult", 0, "item", default=[])
+_TOTAL_PAGES = compile_path("findItemsByKeywordsResponse", 0, "paginationOutput", 0, "totalPages", 0)
+_PRICE = compile_path("sellingStatus", 0, "currentPrice", 0, "__value__", default=0)
+_SHIPPING_COST = compile_path("shippingInfo", 0, "shippingServiceCost", 0, "__value__")
+_CONDITION_ID = compile_path("condition", 0, "conditionId", 0, default="")
+_URL = compile_path("viewItemURL", 0, default="")
+_TITLE = compile_path("title", 0)
+
 
-class EbaySource(Source):
+class EbaySource(HttpSource):
     """eBay Finding API integration."""
 
-    FINDING_API_URL = "https://svcs.ebay.com/services/search/FindingService/v1"
+    FINDING_API_URL = settings.EBAY_API_URL
 
     @property
     def name(self) -> str:
@@ -38,7 +46,32 @@ class EbaySource(Source):
     def is_available(self) -> bool:
         return settings.ebay_available
 
-    async def search(self, query: str) -> List[Listing]:
+    @property
+    def cache_ttl(self) -> float:
+        return settings.EBAY_CACHE_TTL
+
+    @property
+    def rate_limit(self) -> float:
+        return settings.EBAY_RATE_LIMIT
+
+    @property
+    def hedge(self) -> bool:
+        return settings.EBAY_HEDGE
+
+    @property
+    def warm_up(self) -> bool:
+        return settings.EBAY_WARMUP
+
+    @property
+    def watch(self) -> bool:
+        return settings.EBAY_WATCH
+
+    @property
+    def sorted_by_price(self) -> bool:
+        # Requested with sortOrder=PricePlusShippingLowest
+        return True
+
+    async def search(self, query: str, page: int = 1) -> List[ListingRecord]:
         if not self.is_available():
             return []
 
@@ -49,78 +82,60 @@ class EbaySource(Source):
             "RESPONSE-DATA-FORMAT": "JSON",
             "REST-PAYLOAD": "",
             "keywords": query,
-            "paginationInput.entriesPerPage": "20",
+            "paginationInput.entriesPerPage": str(self.page_size),
+            "paginationInput.pageNumber": str(page),
             "sortOrder": "PricePlusShippingLowest",
         }
 
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(self.FINDING_API_URL, params=params)
-                response.raise_for_status()
-                data = response.json()
+        return await self._get_listings(
+            self.FINDING_API_URL,
+            params=params,
+            timeout=settings.EBAY_TIMEOUT,
+            parse=lambda data: self._parse_response(data, page),
+        )
 
-            return self._parse_response(data)
+    def _parse_response(self, data: dict, page: int = 1) -> ListingPage:
+        items = _ITEMS(data)
+        listings = ListingPage(more=self._has_more(data, page, len(items)))
 
-        except Exception:
-            # Graceful degradation - return empty on error
-            return []
+        for item in items:
+            listing = self._parse_item(item)
+            if listing:
+                listings.append(listing)
 
-    def _parse_response(self, data: dict) -> List[Listing]:
-        listings = []
+        return listings
 
+    def _has_more(self, data: dict, page: int, item_count: int) -> bool:
+        # Prefer eBay's own page count; fall back to whether the raw page was full
         try:
-            search_result = (
-                data.get("findItemsByKeywordsResponse", [{}])[0]
-                .get("searchResult", [{}])[0]
-            )
+            return page < int(_TOTAL_PAGES(data))
+        except (TypeError, ValueError):
+            return item_count >= self.page_size
 
-            items = search_result.get("item", [])
+    def _parse_item(self, item: dict) -> Optional[ListingRecord]:
+        try:
+            price = float(_PRICE(item))
 
-            for item in items:
-                listing = self._parse_item(item)
-                if listing:
-                    listings.append(listing)
+            # Missing shipping cost means free or not specified
+            shipping_cost = _SHIPPING_COST(item)
+            shipping = float(shipping_cost) if shipping_cost is not None else 0.0
 
-        except (KeyError, IndexError):
-            pass
+            condition = CONDITION_MAP.get(_CONDITION_ID(item), "unknown")
 
-        return listings
-
-    def _parse_item(self, item: dict) -> Optional[Listing]:
-        try:
-            # Extract price
-            selling_status = item.get("sellingStatus", [{}])[0]
-            current_price = selling_status.get("currentPrice", [{}])[0]
-            price = float(current_price.get("__value__", 0))
-
-            # Extract shipping cost
-            shipping_info = item.get("shippingInfo", [{}])[0]
-            shipping_cost = shipping_info.get("shippingServiceCost", [{}])
-            if shipping_cost:
-                shipping = float(shipping_cost[0].get("__value__", 0))
-            else:
-                # Free shipping or not specified
-                shipping_type = shipping_info.get("shippingType", [""])[0]
-                shipping = 0.0 if shipping_type == "Free" else 0.0
-
-            # Extract condition
-            condition_info = item.get("condition", [{}])[0]
-            condition_id = condition_info.get("conditionId", [""])[0]
-            condition = CONDITION_MAP.get(condition_id, "unknown")
-
-            # Extract URL
-            url = item.get("viewItemURL", [""])[0]
+            url = _URL(item)
+            title = _TITLE(item) or None
 
             if not url or price <= 0:
                 return None
 
-            return Listing.create(
+            return ListingRecord.create(
                 source=self.name,
                 price=price,
                 shipping=shipping,
                 condition=condition,
                 url=url,
+                title=title,
             )
 
-        except (KeyError, IndexError, ValueError):
+        except (TypeError, ValueError):
             return None
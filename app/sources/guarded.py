@@ -0,0 +1,44 @@
+import asyncio
+from typing import Dict, List, Union
+
+from app.circuit import CircuitBreaker
+from app.models import ListingRecord
+from app.sources.base import Source, SourceUnavailableError, SourceWrapper
+from config import settings
+
+
+class CircuitBreakerSource(SourceWrapper):
+    """
+    Wrapper that stops calling a failing source for a while.
+
+    While the circuit is open, searches fail immediately with
+    SourceUnavailableError instead of waiting out upstream timeouts.
+    """
+
+    def __init__(self, source: Source):
+        super().__init__(source)
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            cooldown=settings.CIRCUIT_COOLDOWN,
+        )
+
+    async def search(self, query: str, page: int = 1) -> List[ListingRecord]:
+        if not self.breaker.allow_request():
+            raise SourceUnavailableError(f"{self.name}: circuit open")
+
+        try:
+            listings = await self.source.search(query, page)
+        except Exception:
+            # Unexpected errors (e.g. a malformed upstream result) count as failures
+            # too, so a half-open probe always ends with an outcome
+            self.breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+
+        self.breaker.record_success()
+        return listings
+
+    def stats(self) -> Dict[str, Union[str, int]]:
+        return self.breaker.stats()
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Union
+
+from app import metrics
+from app.hedging import HedgeBudget, LatencyTracker
+from app.models import ListingRecord
+from app.sources.base import Source, SourceWrapper
+from config import settings
+
+
+class HedgedSource(SourceWrapper):
+    """
+    Wrapper that hedges slow upstream calls.
+
+    If a search hasn't answered within the source's HEDGE_PERCENTILE
+    latency (at least HEDGE_MIN_DELAY), an identical second request is
+    sent; the first to succeed wins and the other is cancelled. Extra
+    requests are capped at HEDGE_MAX_RATIO of all requests. Only sources
+    whose `hedge` property is True are hedged.
+    """
+
+    def __init__(self, source: Source):
+        super().__init__(source)
+        self._latency = LatencyTracker(settings.HEDGE_WINDOW, settings.HEDGE_MIN_SAMPLES)
+        self._budget = HedgeBudget(settings.HEDGE_MAX_RATIO, burst=settings.HEDGE_BURST)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.over_budget = 0
+
+    async def search(self, query: str, page: int = 1) -> List[ListingRecord]:
+        if not self.hedge:
+            return await self.source.search(query, page)
+
+        self.requests += 1
+        self._budget.on_request()
+        delay = self._delay()
+        primary = asyncio.ensure_future(self._timed_search(query, page))
+        if delay is None:
+            return await primary
+
+        hedge: Optional[asyncio.Future] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            if not self._budget.try_spend():
+                self.over_budget += 1
+                metrics.SOURCE_HEDGES.labels(self.name, "over_budget").inc()
+                return await primary
+
+            self.hedged += 1
+            metrics.SOURCE_HEDGES.labels(self.name, "fired").inc()
+            hedge = asyncio.ensure_future(self._timed_search(query, page))
+            winner = await _first_success(primary, hedge)
+            if winner is hedge:
+                self.hedge_wins += 1
+                metrics.SOURCE_HEDGES.labels(self.name, "won").inc()
+            return winner.result()
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Union[bool, int, Optional[float]]]:
+        delay = self._delay()
+        return {
+            "enabled": self.hedge,
+            "delay": round(delay, 3) if delay is not None else None,
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "over_budget": self.over_budget,
+        }
+
+    def _delay(self) -> Optional[float]:
+        latency = self._latency.percentile(settings.HEDGE_PERCENTILE)
+        if latency is None:
+            return None  # Not enough samples yet to know what "slow" is
+        return max(settings.HEDGE_MIN_DELAY, latency)
+
+    async def _timed_search(self, query: str, page: int) -> List[ListingRecord]:
+        started = time.perf_counter()
+        listings = await self.source.search(query, page)
+        self._latency.record(time.perf_counter() - started)
+        return listings
+
+
+async def _first_success(*tasks: asyncio.Future) -> asyncio.Future:
+    """Wait for the first task to succeed; if all fail, re-raise the first task's error."""
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() is None:
+                return task
+    return tasks[0]  # All failed: .result() raises the primary's error
@@ -2,7 +2,7 @@ import hashlib
 import random
 from typing import List
 
-from app.models import Listing
+from app.models import ListingRecord
 from app.sources.base import Source
 from config import settings
 
@@ -31,8 +31,9 @@ class MockSource(Source):
         # Available when mock mode is enabled OR when no real sources are configured
         return settings.MOCK_MODE or not settings.any_real_source_available
 
-    async def search(self, query: str) -> List[Listing]:
-        if not self.is_available():
+    async def search(self, query: str, page: int = 1) -> List[ListingRecord]:
+        # Mock results always fit on a single page
+        if not self.is_available() or page > 1:
             return []
 
         # Use query hash as seed for reproducible results
@@ -72,12 +73,13 @@ class MockSource(Source):
             url = f"{base_url}{item_id}"
 
             listings.append(
-                Listing.create(
+                ListingRecord.create(
                     source=f"{source_name} (Mock)",
                     price=price,
                     shipping=shipping,
                     condition=condition,
                     url=url,
+                    title=query,
                 )
             )
 
@@ -0,0 +1,43 @@
+from typing import Dict, List
+
+from app.models import ListingRecord
+from app.ratelimit import BACKGROUND, TokenBucket
+from app.sources.base import Source, SourceThrottledError, SourceWrapper
+
+
+class RateLimitedSource(SourceWrapper):
+    """
+    Wrapper that keeps upstream calls under the source's rate limit.
+
+    The limit adapts: it backs off when the upstream answers 429 and
+    recovers gradually as calls succeed. Calls made while BACKGROUND is
+    set (batch work) wait behind interactive ones.
+    """
+
+    def __init__(self, source: Source):
+        super().__init__(source)
+        rate = source.rate_limit
+        self._bucket = TokenBucket(rate, capacity=max(1.0, rate)) if rate > 0 else None
+
+    async def search(self, query: str, page: int = 1) -> List[ListingRecord]:
+        if self._bucket is None:
+            return await self.source.search(query, page)
+
+        await self._bucket.acquire(background=BACKGROUND.get())
+        try:
+            listings = await self.source.search(query, page)
+        except SourceThrottledError:
+            self._bucket.slow_down()
+            raise
+
+        self._bucket.speed_up()
+        return listings
+
+    def stats(self) -> Dict[str, float]:
+        if self._bucket is None:
+            return {"limit": 0.0, "current_rate": 0.0}
+
+        return {
+            "limit": self._bucket.max_rate,
+            "current_rate": round(self._bucket.rate, 3),
+        }
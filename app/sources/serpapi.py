@@ -1,17 +1,31 @@
 import re
 from typing import List, Optional
 
-import httpx
-
-from app.models import Listing
-from app.sources.base import Source
+from app.fastjson import compile_path
+from app.models import ListingPage, ListingRecord
+from app.sources.base import HttpSource
 from config import settings
 
+# Precompiled patterns for the string fields of shopping_results
+_NON_PRICE_CHARS_RE = re.compile(r"[^\d.]")
+_SHIPPING_PRICE_RE = re.compile(r"\$?([\d.]+)")
+_REFURBISHED_RE = re.compile(r"refurbished|renewed|certified")
+_USED_RE = re.compile(r"used|pre-owned|preowned|open box|open-box")
+
+# Fields of a Google Shopping response; malformed values fall back to the default
+_RESULTS = compile_path("shopping_results", default=[])
+_EXTRACTED_PRICE = compile_path("extracted_price")
+_PRICE_TEXT = compile_path("price", default="")
+_DELIVERY = compile_path("delivery", default="")
+_TITLE = compile_path("title")
+_URL = compile_path("product_link", default="")
+_MERCHANT = compile_path("source", default="Unknown")
+
 
-class SerpApiSource(Source):
+class SerpApiSource(HttpSource):
     """Google Shopping via SerpAPI integration."""
 
-    API_URL = "https://serpapi.com/search"
+    API_URL = settings.SERPAPI_API_URL
 
     @property
     def name(self) -> str:
@@ -20,7 +34,27 @@ class SerpApiSource(Source):
     def is_available(self) -> bool:
         return settings.serpapi_available
 
-    async def search(self, query: str) -> List[Listing]:
+    @property
+    def cache_ttl(self) -> float:
+        return settings.SERPAPI_CACHE_TTL
+
+    @property
+    def rate_limit(self) -> float:
+        return settings.SERPAPI_RATE_LIMIT
+
+    @property
+    def hedge(self) -> bool:
+        return settings.SERPAPI_HEDGE
+
+    @property
+    def warm_up(self) -> bool:
+        return settings.SERPAPI_WARMUP
+
+    @property
+    def watch(self) -> bool:
+        return settings.SERPAPI_WATCH
+
+    async def search(self, query: str, page: int = 1) -> List[ListingRecord]:
         if not self.is_available():
             return []
 
@@ -28,71 +62,68 @@ class SerpApiSource(Source):
             "engine": "google_shopping",
             "q": query,
             "api_key": settings.SERPAPI_KEY,
-            "num": "20",
+            "num": str(self.page_size),
+            "start": str((page - 1) * self.page_size),
             "gl": "us",  # Country
             "hl": "en",  # Language
         }
 
-        try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.get(self.API_URL, params=params)
-                response.raise_for_status()
-                data = response.json()
+        return await self._get_listings(
+            self.API_URL,
+            params=params,
+            timeout=settings.SERPAPI_TIMEOUT,
+            parse=self._parse_response,
+        )
 
-            return self._parse_response(data)
+    def _parse_response(self, data: dict) -> ListingPage:
+        results = _RESULTS(data) or []
+        # A full raw page may have more after it, however many results parse
+        listings = ListingPage(more=len(results) >= self.page_size)
 
-        except Exception:
-            # Graceful degradation - return empty on error
-            return []
-
-    def _parse_response(self, data: dict) -> List[Listing]:
-        listings = []
-
-        shopping_results = data.get("shopping_results", [])
-
-        for result in shopping_results:
+        for result in results:
             listing = self._parse_result(result)
             if listing:
                 listings.append(listing)
 
         return listings
 
-    def _parse_result(self, result: dict) -> Optional[Listing]:
+    def _parse_result(self, result: dict) -> Optional[ListingRecord]:
         try:
             # Extract price - prefer extracted_price (numeric) over price (string)
-            price = result.get("extracted_price")
+            price = _EXTRACTED_PRICE(result)
             if price is None:
-                price_str = result.get("price", "")
-                price = self._extract_price(price_str)
+                price = self._extract_price(_PRICE_TEXT(result))
 
             if price is None or price <= 0:
                 return None
 
             # Extract shipping from delivery info or assume free
             shipping = 0.0
-            delivery = result.get("delivery", "")
+            delivery = _DELIVERY(result)
             if delivery:
                 shipping = self._extract_shipping(delivery)
 
             # Condition - Google Shopping typically shows new items
             # but we can infer from title/snippet
-            title = result.get("title", "").lower()
-            condition = self._infer_condition(title)
+            title = _TITLE(result) or None
+            condition = self._infer_condition(title or "")
 
             # Extract URL
-            url = result.get("product_link", "")
+            url = _URL(result)
             if not url:
                 return None
 
-            return Listing.create(
-                source=f"{self.name} ({result.get('source', 'Unknown')})",
+            return ListingRecord.create(
+                source=f"{self.name} ({_MERCHANT(result)})",
                 price=float(price),
                 shipping=shipping,
                 condition=condition,
                 url=url,
+                title=title,
             )
 
-        except (KeyError, ValueError):
+        except (KeyError, ValueError, TypeError):
+            # Skip a malformed result rather than failing the whole page
             return None
 
     def _extract_price(self, price_str: str) -> Optional[float]:
@@ -101,7 +132,7 @@ class SerpApiSource(Source):
             return None
 
         # Remove currency symbols and commas
-        cleaned = re.sub(r"[^\d.]", "", price_str)
+        cleaned = _NON_PRICE_CHARS_RE.sub("", price_str)
         try:
             return float(cleaned)
         except ValueError:
@@ -115,7 +146,7 @@ class SerpApiSource(Source):
             return 0.0
 
         # Try to find a price in the delivery string
-        match = re.search(r"\$?([\d.]+)", delivery_str)
+        match = _SHIPPING_PRICE_RE.search(delivery_str)
         if match:
             try:
                 return float(match.group(1))
@@ -128,11 +159,9 @@ class SerpApiSource(Source):
         """Infer condition from title keywords."""
         title_lower = title.lower()
 
-        if any(word in title_lower for word in ["refurbished", "renewed", "certified"]):
+        if _REFURBISHED_RE.search(title_lower):
             return "refurbished"
-        if any(word in title_lower for word in ["used", "pre-owned", "preowned"]):
-            return "used"
-        if any(word in title_lower for word in ["open box", "open-box"]):
+        if _USED_RE.search(title_lower):
             return "used"
 
         # Default to new for Google Shopping results
@@ -0,0 +1,109 @@
+import gzip
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+# Preferred first when the client accepts several
+ENCODING_PREFERENCE = ("br", "gzip", "identity")
+
+
+@dataclass(frozen=True)
+class PrecompressedAsset:
+    """
+    A static file read once and kept in memory, precompressed with gzip
+    (and brotli when installed), with a strong ETag per encoding.
+    """
+
+    media_type: str
+    digest: str
+    bodies: Dict[str, bytes]
+
+    @classmethod
+    def load(cls, path: Path, media_type: str) -> "PrecompressedAsset":
+        raw = path.read_bytes()
+        bodies = {"identity": raw, "gzip": gzip.compress(raw, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            bodies["br"] = brotli.compress(raw, quality=11)
+        return cls(media_type, hashlib.sha256(raw).hexdigest()[:32], bodies)
+
+    def etag(self, encoding: str) -> str:
+        # Strong ETags must differ between encodings of the same content
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+    def response(self, request_headers: Headers, cache_control: str) -> Response:
+        """200 with the best encoding the client accepts, or 304 if its copy is current."""
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""), self.bodies)
+        headers = {
+            "ETag": self.etag(encoding),
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if self._matches(request_headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(self.bodies[encoding], media_type=self.media_type, headers=headers)
+
+    def _matches(self, if_none_match: Optional[str]) -> bool:
+        # Any encoding of the same content is current
+        return etag_matches(if_none_match, (self.etag(encoding) for encoding in self.bodies))
+
+
+def etag_matches(if_none_match: Optional[str], etags: Iterable[str]) -> bool:
+    """Whether an If-None-Match header matches one of `etags` (weak comparison, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return not tags.isdisjoint(etag.removeprefix("W/") for etag in etags)
+
+
+def negotiate_encoding(accept_encoding: str, available: Dict[str, bytes]) -> str:
+    """Pick a content coding from an Accept-Encoding header (q=0 means refused)."""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            refused = params and float(quality) == 0
+        except ValueError:
+            refused = False
+        if name and not refused:
+            accepted.add(name)
+
+    for encoding in ENCODING_PREFERENCE:
+        if encoding in available and (encoding in accepted or "*" in accepted or encoding == "identity"):
+            return encoding
+    return "identity"
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZip responses of at least `minimum_size` bytes, except streaming
+    (NDJSON) endpoints, where a compressor could hold back events that
+    the client should render as they arrive.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, compresslevel: int, streaming_suffix: str = "/stream"):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.streaming_suffix = streaming_suffix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].endswith(self.streaming_suffix):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
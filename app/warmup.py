@@ -0,0 +1,288 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional
+
+from app.normalizer import NormalizedProduct
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; concurrent saves may then drop hits, and every worker warms
+    fcntl = None
+
+
+@dataclass
+class LoggedQuery:
+    query: str  # Latest search text seen for the key; sent upstream when warming
+    hits: int
+    last_seen: float
+
+
+class QueryLog:
+    """
+    Rolling log of recent normalized queries with hit counts.
+
+    Queries are counted in memory by canonical key and merged into a JSON
+    file on save: each worker adds only the hits it saw since its last save
+    (under a file lock), so several workers can share one log. Queries not
+    seen for `max_age` seconds are dropped, and only the `max_queries`
+    most requested are kept.
+    """
+
+    def __init__(self, path: str, max_queries: int, max_age: float):
+        self.path = path
+        self.max_queries = max_queries
+        self.max_age = max_age
+        self._queries: Dict[str, LoggedQuery] = {}
+        self._unsaved: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    def record(self, normalized: NormalizedProduct) -> None:
+        now = time.time()
+        entry = self._queries.get(normalized.key)
+        if entry is None:
+            entry = self._queries[normalized.key] = LoggedQuery(normalized.search_query, 0, now)
+        entry.query = normalized.search_query
+        entry.hits += 1
+        entry.last_seen = now
+        self._unsaved[normalized.key] = self._unsaved.get(normalized.key, 0) + 1
+
+        # Bound memory between saves when many distinct queries arrive
+        if len(self._queries) > 2 * self.max_queries:
+            self._queries = self._prune(self._queries, now)
+
+    def top(self, count: int) -> List[str]:
+        """Search text of the `count` most requested recent queries, most requested first."""
+        entries = self._prune(self._queries, time.time()).values()
+        ranked = sorted(entries, key=lambda entry: (-entry.hits, -entry.last_seen))
+        return [entry.query for entry in ranked[:count]]
+
+    def load(self) -> int:
+        """Read the saved log (if any); return the number of queries loaded."""
+        self._queries = self._prune(_read_log(self.path), time.time())
+        self._unsaved.clear()
+        return len(self._queries)
+
+    def save(self) -> bool:
+        """Merge hits seen since the last save into the file; False if there was nothing to save."""
+        pending = self._take_unsaved()
+        if not pending:
+            return False
+        try:
+            merged = self._merge_into_file(pending)
+        except Exception:
+            self._restore_unsaved(pending)
+            raise
+        self._replace(merged)
+        return True
+
+    async def asave(self) -> bool:
+        """`save` for use on the event loop; the locked file merge runs in a thread."""
+        # Snapshot on the loop, since record() keeps counting while the merge runs
+        pending = self._take_unsaved()
+        if not pending:
+            return False
+        try:
+            merged = await asyncio.to_thread(self._merge_into_file, pending)
+        except Exception:  # If cancelled instead, the thread still finishes the merge
+            self._restore_unsaved(pending)
+            raise
+        self._replace(merged)
+        return True
+
+    def _take_unsaved(self) -> Dict[str, LoggedQuery]:
+        """Copies of the entries with unsaved hits (counting only those hits); resets the count."""
+        pending = self._unsaved_entries()
+        self._unsaved = {}
+        return pending
+
+    def _unsaved_entries(self) -> Dict[str, LoggedQuery]:
+        pending = {}
+        for key, hits in self._unsaved.items():
+            entry = self._queries.get(key)
+            if entry is not None:  # Otherwise pruned from memory since it was counted
+                pending[key] = LoggedQuery(entry.query, hits, entry.last_seen)
+        return pending
+
+    def _restore_unsaved(self, pending: Dict[str, LoggedQuery]) -> None:
+        for key, entry in pending.items():
+            self._unsaved[key] = self._unsaved.get(key, 0) + entry.hits
+
+    def _merge_into_file(self, pending: Dict[str, LoggedQuery]) -> Dict[str, LoggedQuery]:
+        """Add `pending` hits to the saved log under the file lock; return the merged log."""
+        with _locked(self.path + ".lock"):
+            saved = _read_log(self.path)
+            _add_hits(saved, pending)
+            merged = self._prune(saved, time.time())
+            _write_log(self.path, merged)
+        return merged
+
+    def _replace(self, merged: Dict[str, LoggedQuery]) -> None:
+        # Hits recorded while the file was merged stay unsaved; count them on top
+        _add_hits(merged, self._unsaved_entries())
+        self._queries = merged
+
+    def _prune(self, queries: Dict[str, LoggedQuery], now: float) -> Dict[str, LoggedQuery]:
+        recent = [(key, e) for key, e in queries.items() if now - e.last_seen <= self.max_age]
+        recent.sort(key=lambda item: (-item[1].hits, -item[1].last_seen))
+        return dict(recent[:self.max_queries])
+
+
+def _add_hits(queries: Dict[str, LoggedQuery], pending: Dict[str, LoggedQuery]) -> None:
+    for key, entry in pending.items():
+        previous = queries.get(key)
+        if previous is None:
+            queries[key] = LoggedQuery(entry.query, entry.hits, entry.last_seen)
+        else:
+            previous.hits += entry.hits
+            if entry.last_seen >= previous.last_seen:
+                previous.query, previous.last_seen = entry.query, entry.last_seen
+
+
+def _read_log(path: str) -> Dict[str, LoggedQuery]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return {
+            item["key"]: LoggedQuery(item["query"], int(item["hits"]), float(item["last_seen"]))
+            for item in data["queries"]
+        }
+    except FileNotFoundError:
+        return {}
+    except (ValueError, KeyError, TypeError):
+        return {}  # Corrupt or foreign file; start a new log
+
+
+def _write_log(path: str, queries: Dict[str, LoggedQuery]) -> None:
+    # Replace atomically so a crash mid-write never loses the previous log
+    data = {
+        "queries": [
+            {"key": key, "query": e.query, "hits": e.hits, "last_seen": e.last_seen}
+            for key, e in queries.items()
+        ]
+    }
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(path + ".tmp", path)
+
+
+@contextmanager
+def _locked(path: str) -> Iterator[None]:
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+WarmFn = Callable[[str], Awaitable[None]]
+
+
+class CacheWarmer:
+    """
+    Background task that pre-fetches the most requested logged queries
+    after startup, so the first users after a restart get cached results.
+
+    Queries are warmed one at a time, at most `rate` per second, so the
+    warm-up leaves upstream quota for live traffic. The service counts as
+    ready once the warm-up is finished or `max_wait` seconds have passed.
+
+    With `lock_path` (a cache shared between workers), only the worker
+    that takes the lock warms; the others skip the warm-up.
+    """
+
+    def __init__(
+        self,
+        log: QueryLog,
+        warm: WarmFn,
+        count: int,
+        rate: float,
+        max_wait: float,
+        lock_path: Optional[str] = None,
+    ):
+        self.log = log
+        self.warm = warm
+        self.count = count
+        self.rate = rate
+        self.max_wait = max_wait
+        self.lock_path = lock_path
+        self.skipped = False
+        self.total = 0
+        self.warmed = 0
+        self.failures = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock_file = None
+
+    def start(self) -> None:
+        if self._task is not None or self.skipped:
+            return
+        if self.lock_path is not None and not self._take_lock():
+            self.skipped = True  # Another worker is warming the shared cache
+            return
+        self.started_at = time.time()
+        self._task = asyncio.create_task(self._run(self.log.top(self.count)))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def ready(self, now: float) -> bool:
+        if self.skipped or self.finished_at is not None:
+            return True
+        return self.started_at is not None and now - self.started_at >= self.max_wait
+
+    def stats(self) -> Dict[str, object]:
+        if self.skipped:
+            state = "skipped"
+        elif self.finished_at is not None:
+            state = "done"
+        elif self.started_at is not None:
+            state = "running"
+        else:
+            state = "pending"
+        return {
+            "state": state,
+            "total": self.total,
+            "warmed": self.warmed,
+            "failures": self.failures,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    def _take_lock(self) -> bool:
+        """Hold the warm-up lock for the life of the process; False if another worker has it."""
+        if fcntl is None:
+            return True
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    async def _run(self, queries: List[str]) -> None:
+        self.total = len(queries)
+        interval = 1.0 / self.rate if self.rate > 0 else 0.0
+        loop = asyncio.get_running_loop()
+
+        for query in queries:
+            started = loop.time()
+            try:
+                await self.warm(query)
+                self.warmed += 1
+            except Exception:
+                # A query that fails now will be fetched on demand
+                self.failures += 1
+            await asyncio.sleep(max(0.0, started + interval - loop.time()))
+
+        self.finished_at = time.time()
@@ -0,0 +1,349 @@
+import asyncio
+import hashlib
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from app.deduplicator import TopKListings, listing_identity
+from app.models import ListingRecord, PriceDelta
+from app.normalizer import NormalizedProduct
+from config import settings
+
+# Weight of one refresh's changed share in the volatility average
+VOLATILITY_ALPHA = 0.3
+# A fully volatile product is refreshed this many times more often
+VOLATILITY_WEIGHT = 10.0
+
+
+class WatchlistFullError(Exception):
+    """Raised when adding a product would exceed WATCHLIST_MAX_PRODUCTS."""
+    pass
+
+
+class WatchlistRefreshError(Exception):
+    """Raised when no source answered a refresh, so there is nothing to record."""
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class PriceDeltaRecord:
+    """
+    One change to a watched product's listings between two refreshes.
+
+    `change` is "added", "removed" or "changed" (total price moved).
+    `listing` is the new listing, or the last seen one if it was removed.
+    """
+
+    timestamp: float
+    change: str
+    listing: ListingRecord
+    previous_total_price: Optional[float] = None
+
+    def to_delta(self) -> PriceDelta:
+        return PriceDelta(
+            timestamp=self.timestamp,
+            change=self.change,
+            listing=self.listing.to_listing(),
+            previous_total_price=self.previous_total_price,
+        )
+
+
+@dataclass
+class WatchedProduct:
+    """A watched product with its latest snapshot and price-change history."""
+
+    id: str
+    product_name: str
+    normalized: NormalizedProduct
+    limit: int
+    pages: int
+    added_at: float
+    next_refresh_at: float
+    refreshed_at: Optional[float] = None
+    refresh_count: int = 0
+    # Exponential average of the share of listings that changed per refresh (0-1)
+    volatility: float = 0.0
+    # Reads, decaying with a half-life of WATCHLIST_DEMAND_HALF_LIFE
+    demand: float = 0.0
+    demand_at: float = 0.0
+    # Latest listings keyed by canonical URL, cheapest first
+    snapshot: Dict[str, ListingRecord] = field(default_factory=dict)
+    # Name of the source each snapshot listing came from, by canonical URL
+    snapshot_sources: Dict[str, str] = field(default_factory=dict)
+    history: Deque[PriceDeltaRecord] = field(default_factory=deque)
+
+    def current_demand(self, now: float) -> float:
+        if self.demand == 0.0:
+            return 0.0
+        half_life = settings.WATCHLIST_DEMAND_HALF_LIFE
+        return self.demand * 0.5 ** (max(0.0, now - self.demand_at) / half_life)
+
+    def refresh_interval(self, now: float) -> float:
+        """
+        Seconds until the next refresh.
+
+        Stable, unread products are refreshed every WATCHLIST_REFRESH_INTERVAL;
+        volatility and recent demand shorten that, down to
+        WATCHLIST_MIN_INTERVAL, so upstream quota goes where prices move.
+        """
+        weight = 1.0 + VOLATILITY_WEIGHT * self.volatility + self.current_demand(now)
+        return max(settings.WATCHLIST_MIN_INTERVAL, settings.WATCHLIST_REFRESH_INTERVAL / weight)
+
+
+def product_id(normalized: NormalizedProduct) -> str:
+    """Stable short ID for a watched product, derived from its canonical query key."""
+    return hashlib.sha1(normalized.key.encode("utf-8")).hexdigest()[:12]
+
+
+class Watchlist:
+    """
+    In-memory store of watched products.
+
+    Each refresh is diffed against the previous snapshot and only the
+    changed listings are appended to the product's history (bounded to
+    WATCHLIST_MAX_DELTAS), so reads of the latest snapshot never touch
+    the sources. Sources that failed a refresh keep their previous
+    listings in the snapshot.
+    """
+
+    def __init__(self, max_products: int, max_deltas: int):
+        self.max_products = max_products
+        self.max_deltas = max_deltas
+        self._products: Dict[str, WatchedProduct] = {}
+        self._by_query: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def add(self, product_name: str, normalized: NormalizedProduct, limit: int, pages: int) -> WatchedProduct:
+        """Watch a product (or widen an existing watch); it is refreshed right away."""
+        key = product_id(normalized)
+        product = self._products.get(key)
+        if product is not None:
+            product.limit = max(product.limit, limit)
+            product.pages = max(product.pages, pages)
+            return product
+
+        if len(self._products) >= self.max_products:
+            raise WatchlistFullError(f"Watchlist is full ({self.max_products} products)")
+
+        now = time.time()
+        product = WatchedProduct(
+            id=key,
+            product_name=product_name,
+            normalized=normalized,
+            limit=limit,
+            pages=pages,
+            added_at=now,
+            next_refresh_at=now,
+            history=deque(maxlen=self.max_deltas),
+        )
+        self._products[key] = product
+        self._by_query[normalized.key] = key
+        return product
+
+    def remove(self, key: str) -> bool:
+        product = self._products.pop(key, None)
+        if product is None:
+            return False
+        self._by_query.pop(product.normalized.key, None)
+        return True
+
+    def get(self, key: str) -> Optional[WatchedProduct]:
+        return self._products.get(key)
+
+    def products(self) -> List[WatchedProduct]:
+        return list(self._products.values())
+
+    def touch(self, key: str) -> None:
+        """Record a read of a watched product (raises its refresh priority)."""
+        product = self._products.get(key)
+        if product is None:
+            return
+        now = time.time()
+        product.demand = product.current_demand(now) + 1.0
+        product.demand_at = now
+        self._reschedule(product, now)
+
+    def touch_query(self, query_key: str) -> None:
+        """Record demand from a /compare request, if its query (by canonical key) is watched."""
+        key = self._by_query.get(query_key)
+        if key is not None:
+            self.touch(key)
+
+    def due(self, now: float) -> List[WatchedProduct]:
+        """Products due for a refresh, most overdue first."""
+        due = [p for p in self._products.values() if p.next_refresh_at <= now]
+        due.sort(key=lambda p: p.next_refresh_at)
+        return due
+
+    def next_refresh_at(self, exclude: Optional[Set[str]] = None) -> Optional[float]:
+        times = [
+            p.next_refresh_at for key, p in self._products.items()
+            if not exclude or key not in exclude
+        ]
+        return min(times, default=None)
+
+    def record(
+        self,
+        key: str,
+        results: Dict[str, List[ListingRecord]],
+        now: float,
+    ) -> List[PriceDeltaRecord]:
+        """
+        Store a refresh result and return the deltas against the previous snapshot.
+
+        `results` maps each source that answered to its relevant listings.
+        Sources missing from it (failed or timed out) keep their previous
+        listings, so an outage isn't recorded as their listings being removed.
+        """
+        product = self._products.get(key)
+        if product is None:
+            return []  # Removed while refreshing
+
+        # Listing -> source it came from; the cheapest `limit` make the snapshot
+        origins: Dict[ListingRecord, str] = {
+            listing: product.snapshot_sources[url]
+            for url, listing in product.snapshot.items()
+            if product.snapshot_sources[url] not in results
+        }
+        for source, listings in results.items():
+            origins.update((listing, source) for listing in listings)
+        top = TopKListings(product.limit)
+        top.extend(origins)
+
+        snapshot: Dict[str, ListingRecord] = {}
+        snapshot_sources: Dict[str, str] = {}
+        for listing in top.results():
+            url = listing_identity(listing).url
+            snapshot[url] = listing
+            snapshot_sources[url] = origins[listing]
+        deltas = _diff(product.snapshot, snapshot, now)
+
+        if product.refresh_count:
+            changed_share = min(1.0, len(deltas) / max(len(product.snapshot), len(snapshot), 1))
+            product.volatility += VOLATILITY_ALPHA * (changed_share - product.volatility)
+
+        product.history.extend(deltas)
+        product.snapshot = snapshot
+        product.snapshot_sources = snapshot_sources
+        product.refreshed_at = now
+        product.refresh_count += 1
+        self._reschedule(product, now)
+        return deltas
+
+    def record_failure(self, key: str, now: float) -> None:
+        """Keep the previous snapshot and retry after the minimum interval."""
+        product = self._products.get(key)
+        if product is not None:
+            product.next_refresh_at = now + settings.WATCHLIST_MIN_INTERVAL
+
+    def _reschedule(self, product: WatchedProduct, now: float) -> None:
+        if product.refreshed_at is None:
+            return  # First refresh is still pending
+        product.next_refresh_at = product.refreshed_at + product.refresh_interval(now)
+
+
+def _diff(
+    previous: Dict[str, ListingRecord],
+    current: Dict[str, ListingRecord],
+    now: float,
+) -> List[PriceDeltaRecord]:
+    deltas = []
+    for key, listing in current.items():
+        old = previous.get(key)
+        if old is None:
+            deltas.append(PriceDeltaRecord(now, "added", listing))
+        elif old.total_price != listing.total_price:
+            deltas.append(PriceDeltaRecord(now, "changed", listing, old.total_price))
+
+    for key, listing in previous.items():
+        if key not in current:
+            deltas.append(PriceDeltaRecord(now, "removed", listing, listing.total_price))
+
+    return deltas
+
+
+# Returns the relevant listings of each source that answered, by source name
+RefreshFn = Callable[[WatchedProduct], Awaitable[Dict[str, List[ListingRecord]]]]
+
+
+class WatchlistScheduler:
+    """
+    Background task that refreshes watched products when they are due.
+
+    At most `concurrency` refreshes run at once; the loop sleeps until the
+    next product is due or it is woken (a product was added or a refresh
+    finished).
+    """
+
+    def __init__(self, watchlist: Watchlist, refresh: RefreshFn, concurrency: int):
+        self.watchlist = watchlist
+        self.refresh = refresh
+        self.concurrency = max(1, concurrency)
+        self.refreshes = 0
+        self.failures = 0
+        self._running: Dict[str, asyncio.Task] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wake = asyncio.Event()  # Bound to the running loop on first use
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = list(self._running.values())
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "products": len(self.watchlist),
+            "refreshing": len(self._running),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            now = time.time()
+
+            for product in self.watchlist.due(now):
+                if len(self._running) >= self.concurrency:
+                    break
+                if product.id not in self._running:
+                    self._running[product.id] = asyncio.create_task(self._refresh(product))
+
+            timeout = None
+            if len(self._running) < self.concurrency:
+                next_at = self.watchlist.next_refresh_at(exclude=set(self._running))
+                if next_at is not None:
+                    timeout = max(0.0, next_at - now)
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refresh(self, product: WatchedProduct) -> None:
+        try:
+            results = await self.refresh(product)
+        except Exception:
+            self.failures += 1
+            self.watchlist.record_failure(product.id, time.time())
+        else:
+            self.refreshes += 1
+            self.watchlist.record(product.id, results, time.time())
+        finally:
+            self._running.pop(product.id, None)
+            self._wake.set()
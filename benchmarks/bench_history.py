@@ -0,0 +1,86 @@
+"""
+Benchmark: price-history aggregates over a large columnar segment.
+
+Usage:
+    python -m benchmarks.bench_history [--points N] [--repeat N]
+
+Writes N price points for one query into a temporary history directory
+(spread over 30 days, 3 sources, 3 conditions), then times window stats,
+filtered stats and the historical low. Uses numpy when installed, else
+the pure-Python fallback (much slower; try a smaller --points).
+"""
+import argparse
+import random
+import tempfile
+import time
+from typing import Any, Callable
+
+from app import history
+from app.history import PriceHistory
+from app.models import ListingRecord
+
+QUERY = "Sony WH-1000XM5"
+DAY = 86400.0
+
+
+def populate(store: PriceHistory, points: int, seed: int = 42) -> float:
+    """Append `points` listings in batches of 50; return the first timestamp."""
+    rng = random.Random(seed)
+    sources = ["eBay", "Google Shopping (Best Buy)", "Google Shopping (Walmart)"]
+    conditions = ["new", "used", "refurbished"]
+    listings = [
+        ListingRecord.create(
+            rng.choice(sources),
+            round(rng.uniform(150, 400), 2),
+            rng.choice([0.0, 4.99, 9.99]),
+            rng.choice(conditions),
+            f"https://example.com/item/{i}",
+        )
+        for i in range(50)
+    ]
+
+    batches = points // len(listings)
+    start = time.time() - 30 * DAY
+    step = 30 * DAY / batches
+    chunk = 10_000
+    for offset in range(0, batches, chunk):
+        store._append(QUERY, [(start + (offset + i) * step, tuple(listings)) for i in range(min(chunk, batches - offset))])
+    return start
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> float:
+    """Best of `repeat` runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        store = PriceHistory(path, sample_interval=0)
+        started = time.perf_counter()
+        start = populate(store, args.points)
+        print(f"Backend: {'numpy' if history.np is not None else 'python'}")
+        print(f"Wrote {args.points:,} points in {time.perf_counter() - started:.1f}s")
+
+        last_week = start + 23 * DAY
+        rows = [
+            ("stats, all history", lambda: store.stats(QUERY, percentiles=(10, 90))),
+            ("stats, last 7 days", lambda: store.stats(QUERY, since=last_week, percentiles=(10, 90))),
+            ("stats, eBay + used", lambda: store.stats(QUERY, source="eBay", condition="used")),
+            ("historical low", lambda: store.lowest(QUERY)),
+        ]
+        for label, fn in rows:
+            print(f"{label:<22} {measure(fn, args.repeat):>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: Pydantic listings everywhere vs slotted records with Pydantic at the edge.
+
+Usage:
+    python -m benchmarks.bench_listings [--items N] [--requests N]
+
+Simulates one /compare request: parse N raw eBay items, dedupe, rank and
+return the top 10. The "pydantic" path builds a `Listing` per raw item
+(the old behaviour); the "records" path builds `ListingRecord`s and only
+converts the returned top 10. Reports CPU time and allocated bytes per
+request.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from typing import Callable, List
+
+from app.deduplicator import TopKListings, deduplicate_listings
+from app.models import Listing, ListingRecord
+
+TOP_K = 10
+
+
+def make_items(count: int, seed: int = 42) -> List[dict]:
+    """Raw items in the eBay Finding API JSON shape (every scalar wrapped in a list)."""
+    rng = random.Random(seed)
+    items = []
+    for _ in range(count):
+        item_id = rng.randint(100000000000, 999999999999)
+        items.append({
+            "itemId": [str(item_id)],
+            "title": [f"Sony WH-1000XM5 Wireless Headphones #{item_id}"],
+            "viewItemURL": [f"https://www.ebay.com/itm/{item_id}"],
+            "sellingStatus": [{"currentPrice": [{"@currencyId": "USD", "__value__": f"{rng.uniform(150, 400):.2f}"}]}],
+            "shippingInfo": [{"shippingServiceCost": [{"@currencyId": "USD", "__value__": f"{rng.choice([0, 4.99, 9.99]):.2f}"}]}],
+            "condition": [{"conditionId": [rng.choice(["1000", "1500", "2500", "3000"])]}],
+        })
+    return items
+
+
+def _fields(item: dict) -> tuple:
+    price = float(item["sellingStatus"][0]["currentPrice"][0]["__value__"])
+    shipping = float(item["shippingInfo"][0]["shippingServiceCost"][0]["__value__"])
+    return "eBay", price, shipping, "new", item["viewItemURL"][0], item["title"][0]
+
+
+def pydantic_request(items: List[dict]) -> List[Listing]:
+    listings = [
+        Listing.create(source, price, shipping, condition, url, title)
+        for source, price, shipping, condition, url, title in map(_fields, items)
+    ]
+    unique = deduplicate_listings(listings)
+    return sorted(unique, key=lambda x: x.total_price)[:TOP_K]
+
+
+def records_request(items: List[dict]) -> List[Listing]:
+    top = TopKListings(TOP_K)
+    top.extend(ListingRecord.create(*fields) for fields in map(_fields, items))
+    return [record.to_listing() for record in top.results()]
+
+
+def measure(fn: Callable, items: List[dict], requests: int) -> tuple:
+    fn(items)  # Warm-up
+    start = time.process_time()
+    for _ in range(requests):
+        fn(items)
+    cpu_us = (time.process_time() - start) / requests * 1e6
+
+    tracemalloc.start()
+    fn(items)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu_us, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=60, help="raw listings per request")
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    assert [l.url for l in pydantic_request(items)] == [l.url for l in records_request(items)]
+
+    print(f"{args.items} raw listings per request, top {TOP_K} returned, {args.requests} requests")
+    baseline = None
+    for name, fn in [("pydantic", pydantic_request), ("records", records_request)]:
+        cpu_us, peak = measure(fn, items, args.requests)
+        note = "" if baseline is None else f"  ({baseline[0] / cpu_us:.1f}x CPU, {baseline[1] / peak:.1f}x memory)"
+        print(f"{name:>9}: {cpu_us:8.1f} us/request, peak {peak / 1024:7.1f} KiB{note}")
+        baseline = baseline or (cpu_us, peak)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark for normalize_product: cold (uncached) vs warm (memoized) calls.
+
+Usage:
+    python -m benchmarks.bench_normalize [--corpus PATH] [--repeat N]
+
+The corpus is either a text file with one product name per line or a
+JSONL file whose records have a "product_name" (or "title") field.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import List
+
+from app.normalizer import _normalize_cleaned, normalize_product
+
+DEFAULT_CORPUS = Path(__file__).parent / "queries.txt"
+
+
+def load_corpus(path: Path) -> List[str]:
+    queries = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if path.suffix == ".jsonl":
+            record = json.loads(line)
+            line = record.get("product_name") or record.get("title") or ""
+        if line:
+            queries.append(line)
+    return queries
+
+
+def per_call_ns(queries: List[str], repeat: int, fn) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        for query in queries:
+            fn(query)
+    return (time.perf_counter_ns() - start) / (repeat * len(queries))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    queries = load_corpus(args.corpus)
+    uncached = _normalize_cleaned.__wrapped__
+
+    cold = per_call_ns(queries, args.repeat, lambda q: uncached(q.strip()))
+
+    _normalize_cleaned.cache_clear()
+    normalize_product(queries[0])  # Exclude first-call import/setup effects
+    _normalize_cleaned.cache_clear()
+    first_pass = per_call_ns(queries, 1, normalize_product)
+    warm = per_call_ns(queries, args.repeat, normalize_product)
+
+    info = _normalize_cleaned.cache_info()
+    print(f"corpus: {len(queries)} queries ({len(set(queries))} distinct) from {args.corpus}")
+    print(f"cold (no memoization): {cold:10.0f} ns/call")
+    print(f"first pass (filling):  {first_pass:10.0f} ns/call")
+    print(f"warm (memoized):       {warm:10.0f} ns/call  ({cold / warm:.1f}x faster)")
+    print(f"cache: {info.hits} hits, {info.misses} misses, size {info.currsize}/{info.maxsize}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: upstream response decoding and parsing.
+
+Usage:
+    python -m benchmarks.bench_parse [--iterations N]
+
+Decodes and parses the recorded eBay Finding API and SerpAPI Shopping
+payloads in benchmarks/fixtures. Compares stdlib `json` with `orjson`
+(when installed) for decoding, and the old chained `.get(...)[0]` eBay
+parser with the path extractors (`fastjson.compile_path`) now used by
+`EbaySource` and `SerpApiSource`. Reports microseconds per response.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+from app import fastjson
+from app.models import ListingRecord
+from app.sources.ebay import CONDITION_MAP, EbaySource
+from app.sources.serpapi import SerpApiSource
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def legacy_parse_ebay(data: dict) -> List[ListingRecord]:
+    """The eBay parser before path extractors (kept as a baseline)."""
+    listings = []
+    try:
+        search_result = data.get("findItemsByKeywordsResponse", [{}])[0].get("searchResult", [{}])[0]
+        for item in search_result.get("item", []):
+            listing = _legacy_parse_item(item)
+            if listing:
+                listings.append(listing)
+    except (KeyError, IndexError):
+        pass
+    return listings
+
+
+def _legacy_parse_item(item: dict) -> Optional[ListingRecord]:
+    try:
+        selling_status = item.get("sellingStatus", [{}])[0]
+        current_price = selling_status.get("currentPrice", [{}])[0]
+        price = float(current_price.get("__value__", 0))
+
+        shipping_info = item.get("shippingInfo", [{}])[0]
+        shipping_cost = shipping_info.get("shippingServiceCost", [{}])
+        shipping = float(shipping_cost[0].get("__value__", 0)) if shipping_cost else 0.0
+
+        condition_info = item.get("condition", [{}])[0]
+        condition = CONDITION_MAP.get(condition_info.get("conditionId", [""])[0], "unknown")
+
+        url = item.get("viewItemURL", [""])[0]
+        title = item.get("title", [""])[0] or None
+        if not url or price <= 0:
+            return None
+
+        return ListingRecord.create("eBay", price, shipping, condition, url, title)
+    except (KeyError, ValueError):
+        return None
+
+
+def measure(fn: Callable[[], Any], iterations: int) -> float:
+    """Mean wall time per call in microseconds."""
+    fn()  # Warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    ebay_raw = (FIXTURES / "ebay_finding.json").read_bytes()
+    serpapi_raw = (FIXTURES / "serpapi_shopping.json").read_bytes()
+    ebay_data = json.loads(ebay_raw)
+    serpapi_data = json.loads(serpapi_raw)
+
+    ebay = EbaySource()
+    serpapi = SerpApiSource()
+    assert legacy_parse_ebay(ebay_data) == ebay._parse_response(ebay_data)
+
+    print(f"JSON backend: {fastjson.JSON_BACKEND}")
+    rows = [
+        ("ebay decode (json)", lambda: json.loads(ebay_raw)),
+        ("ebay decode (fastjson)", lambda: fastjson.loads(ebay_raw)),
+        ("ebay parse (legacy)", lambda: legacy_parse_ebay(ebay_data)),
+        ("ebay parse (extractors)", lambda: ebay._parse_response(ebay_data)),
+        ("ebay end-to-end (legacy)", lambda: legacy_parse_ebay(json.loads(ebay_raw))),
+        ("ebay end-to-end (new)", lambda: ebay._parse_response(fastjson.loads(ebay_raw))),
+        ("serpapi decode (json)", lambda: json.loads(serpapi_raw)),
+        ("serpapi decode (fastjson)", lambda: fastjson.loads(serpapi_raw)),
+        ("serpapi parse", lambda: serpapi._parse_response(serpapi_data)),
+    ]
+    for label, fn in rows:
+        print(f"{label:<28} {measure(fn, args.iterations):>10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Local stand-in for the eBay Finding API and SerpAPI Google Shopping.
+
+Usage:
+    python -m benchmarks.fake_upstream [--port 9100] [--latency 0.3]
+        [--jitter 0.5] [--error-rate 0.01] [--items 50]
+
+Serves GET /ebay and GET /serpapi with responses in the real JSON shapes
+(including the unused fields), so EbaySource and SerpApiSource exercise
+their real HTTP and parse paths. Point the app at it with:
+
+    EBAY_API_URL=http://127.0.0.1:9100/ebay
+    SERPAPI_API_URL=http://127.0.0.1:9100/serpapi
+    EBAY_APP_ID=fake SERPAPI_KEY=fake
+
+Latency is lognormal around --latency seconds (--jitter is the sigma), so
+a few calls land far in the tail like real upstreams. --error-rate of the
+calls fail with HTTP 500 (or 429 for a fifth of them).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import FastAPI, Request, Response
+
+EBAY_TOTAL_PAGES = 10
+MERCHANTS = ["Best Buy", "Walmart", "Amazon.com", "Target", "eBay", "B&H Photo-Video-Audio", "Newegg"]
+CONDITIONS = [("1000", "New"), ("1500", "Open box"), ("2500", "Seller refurbished"), ("3000", "Used")]
+
+
+def create_app(latency: float, jitter: float, error_rate: float, items: int, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="Fake upstream")
+    rng = random.Random(seed)
+    app.state.calls = 0
+
+    async def delay_or_fail() -> Optional[Response]:
+        app.state.calls += 1
+        if latency > 0:
+            await asyncio.sleep(rng.lognormvariate(math.log(latency), jitter))
+        if rng.random() < error_rate:
+            status = 429 if rng.random() < 0.2 else 500
+            return Response(status_code=status, content=b'{"error": "fake upstream failure"}')
+        return None
+
+    @app.get("/ebay")
+    async def ebay(request: Request) -> Response:
+        failure = await delay_or_fail()
+        if failure is not None:
+            return failure
+        params = request.query_params
+        per_page = min(items, int(params.get("paginationInput.entriesPerPage", items)))
+        page = int(params.get("paginationInput.pageNumber", "1"))
+        body = ebay_payload(params.get("keywords", ""), page, per_page)
+        return Response(content=body, media_type="application/json")
+
+    @app.get("/serpapi")
+    async def serpapi(request: Request) -> Response:
+        failure = await delay_or_fail()
+        if failure is not None:
+            return failure
+        params = request.query_params
+        per_page = min(items, int(params.get("num", items)))
+        page = int(params.get("start", "0")) // max(per_page, 1) + 1
+        body = serpapi_payload(params.get("q", ""), page, per_page)
+        return Response(content=body, media_type="application/json")
+
+    @app.get("/stats")
+    async def stats() -> dict:
+        return {"calls": app.state.calls}
+
+    return app
+
+
+def _rng(query: str, page: int) -> random.Random:
+    digest = hashlib.sha1(f"{query}#{page}".encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+@lru_cache(maxsize=4096)
+def ebay_payload(query: str, page: int, per_page: int) -> bytes:
+    """Deterministic Finding API page for a query (prices ascending across pages)."""
+    rng = _rng(query, page)
+    base = 50.0 + 40.0 * (page - 1)
+    prices = sorted(round(rng.uniform(base, base + 40.0), 2) for _ in range(per_page))
+    found = []
+    for price in prices:
+        item_id = str(rng.randint(110000000000, 399999999999))
+        condition_id, condition_name = rng.choice(CONDITIONS)
+        shipping = rng.choice([0.0, 0.0, 4.99, 9.95])
+        found.append({
+            "itemId": [item_id],
+            "title": [f"{query} {rng.choice(['', 'Wireless', 'Black', 'Bundle'])}".strip()],
+            "globalId": ["EBAY-US"],
+            "primaryCategory": [{"categoryId": ["112529"], "categoryName": ["Headphones"]}],
+            "galleryURL": [f"https://i.ebayimg.com/thumbs/images/g/{item_id}/s-l140.jpg"],
+            "viewItemURL": [f"https://www.ebay.com/itm/{item_id}"],
+            "location": ["Austin,TX,USA"],
+            "country": ["US"],
+            "shippingInfo": [{
+                "shippingServiceCost": [{"@currencyId": "USD", "__value__": f"{shipping}"}],
+                "shippingType": ["Free" if shipping == 0 else "Flat"],
+                "handlingTime": ["1"],
+            }],
+            "sellingStatus": [{
+                "currentPrice": [{"@currencyId": "USD", "__value__": f"{price}"}],
+                "convertedCurrentPrice": [{"@currencyId": "USD", "__value__": f"{price}"}],
+                "sellingState": ["Active"],
+                "timeLeft": ["P12DT3H14M2S"],
+            }],
+            "listingInfo": [{"buyItNowAvailable": ["false"], "listingType": ["FixedPrice"]}],
+            "returnsAccepted": ["true"],
+            "condition": [{"conditionId": [condition_id], "conditionDisplayName": [condition_name]}],
+            "topRatedListing": ["false"],
+        })
+
+    return json.dumps({"findItemsByKeywordsResponse": [{
+        "ack": ["Success"],
+        "version": ["1.13.0"],
+        "searchResult": [{"@count": str(len(found)), "item": found if page <= EBAY_TOTAL_PAGES else []}],
+        "paginationOutput": [{
+            "pageNumber": [str(page)],
+            "entriesPerPage": [str(per_page)],
+            "totalPages": [str(EBAY_TOTAL_PAGES)],
+        }],
+    }]}).encode("utf-8")
+
+
+@lru_cache(maxsize=4096)
+def serpapi_payload(query: str, page: int, per_page: int) -> bytes:
+    """Deterministic Google Shopping results page for a query."""
+    rng = _rng(query, -page)
+    results = []
+    for position in range(per_page):
+        price = round(rng.uniform(60.0, 400.0), 2)
+        product_id = str(rng.randint(10 ** 18, 10 ** 19))
+        results.append({
+            "position": position + 1,
+            "title": f"{query} {rng.choice(['', '(Renewed)', '- Pre-Owned', 'Wireless'])}".strip(),
+            "product_id": product_id,
+            "product_link": f"https://www.google.com/shopping/product/{product_id}?gl=us",
+            "serpapi_product_api": f"https://serpapi.com/search.json?engine=google_product&product_id={product_id}",
+            "source": rng.choice(MERCHANTS),
+            "price": f"${price:,.2f}",
+            "extracted_price": price,
+            "rating": round(rng.uniform(3.8, 4.9), 1),
+            "reviews": rng.randint(50, 30000),
+            "extensions": ["Free returns"],
+            "thumbnail": f"https://encrypted-tbn0.gstatic.com/shopping?q=tbn:{product_id}",
+            "delivery": rng.choice(["Free delivery", "$5.99 delivery", "Free delivery by Tue"]),
+        })
+
+    return json.dumps({
+        "search_metadata": {"status": "Success"},
+        "search_parameters": {"engine": "google_shopping", "q": query},
+        "shopping_results": results,
+    }).encode("utf-8")
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.3, help="median upstream latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="lognormal sigma of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls that fail")
+    parser.add_argument("--items", type=int, default=50, help="max listings per response page")
+    args = parser.parse_args()
+
+    app = create_app(args.latency, args.jitter, args.error_rate, args.items)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
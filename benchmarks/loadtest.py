@@ -0,0 +1,206 @@
+"""
+Load test: replay a query corpus against /compare at a target request rate.
+
+Usage:
+    python -m benchmarks.loadtest [--rps 20] [--duration 30] [--corpus PATH]
+        [--latency 0.3] [--jitter 0.5] [--error-rate 0.01] [--items 50]
+        [--app-url URL] [--endpoint /compare] [--env KEY=VALUE ...]
+
+By default this starts the fake upstream (benchmarks/fake_upstream.py)
+and the app itself as subprocesses, with EbaySource and SerpApiSource
+pointed at the fake, so the real HTTP, parse and ranking paths run.
+Pass --app-url to target an app that is already running (it must be
+configured against the fake upstream, or real APIs, yourself).
+
+Requests are sent open-loop (on a fixed schedule regardless of how fast
+responses come back), so latency under overload is measured honestly.
+Reports throughput, error count, partial results and p50/p95/p99 latency.
+Use --env to compare configurations, e.g. --env CACHE_ENABLED=false.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.bench_normalize import DEFAULT_CORPUS, load_corpus
+
+ROOT = Path(__file__).parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_process(args: List[str], env: Dict[str, str], stderr: IO[bytes]) -> subprocess.Popen:
+    # stderr goes to a file: a pipe nobody drains would block a chatty process mid-run
+    return subprocess.Popen(
+        [sys.executable, *args],
+        cwd=ROOT,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=stderr,
+    )
+
+
+def wait_ready(url: str, process: subprocess.Popen, stderr: IO[bytes], timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            stderr.seek(0)
+            raise RuntimeError(f"{url} exited early:\n{stderr.read().decode(errors='replace')}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not start within {timeout}s")
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    if not ordered:
+        return float("nan")
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+async def replay(
+    app_url: str,
+    endpoint: str,
+    queries: List[str],
+    rps: float,
+    duration: float,
+    auth: Optional[Tuple[str, str]],
+) -> Tuple[List[float], int, int, float]:
+    """Send requests at `rps` for `duration` seconds; return (latencies, errors, partial, elapsed)."""
+    latencies: List[float] = []
+    errors = 0
+    partial = 0
+    total = int(rps * duration)
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=app_url, timeout=60.0, limits=limits, auth=auth) as client:
+
+        async def one(query: str) -> None:
+            nonlocal errors, partial
+            started = time.perf_counter()
+            try:
+                response = await client.post(endpoint, json={"product_name": query})
+            except httpx.HTTPError:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+            elif endpoint == "/compare" and response.json().get("partial"):
+                partial += 1
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        tasks = []
+        for i in range(total):
+            delay = start + i / rps - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(queries[i % len(queries)])))
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - start
+
+    return latencies, errors, partial, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=20.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="text or JSONL query corpus")
+    parser.add_argument("--endpoint", default="/compare", help="/compare or /compare/stream")
+    parser.add_argument("--app-url", help="target a running app instead of starting one")
+    parser.add_argument("--auth", help="user:password for HTTP Basic auth")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake upstream median latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="fake upstream lognormal sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake upstream failure share")
+    parser.add_argument("--items", type=int, default=50, help="fake upstream listings per page")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra app settings")
+    args = parser.parse_args()
+
+    queries = load_corpus(args.corpus)
+    auth = tuple(args.auth.split(":", 1)) if args.auth else None
+    processes: List[subprocess.Popen] = []
+    logs: List[IO[bytes]] = []
+    app_url = args.app_url
+
+    try:
+        if app_url is None:
+            upstream_port, app_port = free_port(), free_port()
+            upstream = f"http://127.0.0.1:{upstream_port}"
+            logs.append(tempfile.TemporaryFile())
+            processes.append(start_process([
+                "-m", "benchmarks.fake_upstream",
+                "--port", str(upstream_port),
+                "--latency", str(args.latency),
+                "--jitter", str(args.jitter),
+                "--error-rate", str(args.error_rate),
+                "--items", str(args.items),
+            ], {}, logs[-1]))
+            wait_ready(f"{upstream}/stats", processes[-1], logs[-1])
+
+            app_env = {
+                "EBAY_APP_ID": "fake",
+                "SERPAPI_KEY": "fake",
+                "EBAY_API_URL": f"{upstream}/ebay",
+                "SERPAPI_API_URL": f"{upstream}/serpapi",
+                "MOCK_MODE": "false",
+                # Measure the service, not the quota protection in front of the fake
+                "EBAY_RATE_LIMIT": "0",
+                "SERPAPI_RATE_LIMIT": "0",
+                "HISTORY_ENABLED": "false",
+                "WATCHLIST_ENABLED": "false",
+                "QUERY_LOG_ENABLED": "false",
+                "AUTH_USERNAME": "",
+                "AUTH_PASSWORD": "",
+            }
+            app_env.update(pair.split("=", 1) for pair in args.env)
+            app_url = f"http://127.0.0.1:{app_port}"
+            logs.append(tempfile.TemporaryFile())
+            processes.append(start_process([
+                "-m", "uvicorn", "app.main:app",
+                "--port", str(app_port),
+                "--log-level", "warning",
+            ], app_env, logs[-1]))
+            wait_ready(f"{app_url}/health", processes[-1], logs[-1])
+
+        latencies, errors, partial, elapsed = asyncio.run(
+            replay(app_url, args.endpoint, queries, args.rps, args.duration, auth)
+        )
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+        for log in logs:
+            log.close()
+
+    latencies.sort()
+    sent = int(args.rps * args.duration)
+    print(f"Requests:   {sent} to {args.endpoint} ({len(queries)} distinct corpus entries)")
+    print(f"Throughput: {len(latencies) / elapsed:.1f} req/s (target {args.rps:g})")
+    print(f"Errors:     {errors}   Partial: {partial}")
+    for p in (50, 95, 99):
+        print(f"p{p}:        {percentile(latencies, p) * 1000:.1f} ms")
+    if latencies:
+        print(f"max:        {latencies[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,10 @@ class Settings:
     # Get your API key at: https://serpapi.com/
     SERPAPI_KEY: Optional[str] = os.getenv("SERPAPI_KEY")
 
+    # Upstream endpoints (override to point at a local stand-in, e.g. for load tests)
+    EBAY_API_URL: str = os.getenv("EBAY_API_URL", "https://svcs.ebay.com/services/search/FindingService/v1")
+    SERPAPI_API_URL: str = os.getenv("SERPAPI_API_URL", "https://serpapi.com/search")
+
     # Authentication credentials (required for production)
     AUTH_USERNAME: Optional[str] = os.getenv("AUTH_USERNAME")
     AUTH_PASSWORD: Optional[str] = os.getenv("AUTH_PASSWORD")
@@ -22,6 +26,119 @@ class Settings:
     # Enable mock mode for testing without API keys
     MOCK_MODE: bool = os.getenv("MOCK_MODE", "false").lower() == "true"
 
+    # Shared upstream connection pool (one client per upstream host)
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    # HTTP/2 is only used when the optional `h2` package is installed
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+    # Search result cache (TTLs in seconds)
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    # "memory" (per process) or "sqlite" (shared by all workers, survives restarts)
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory").lower()
+    CACHE_PATH: str = os.getenv("CACHE_PATH", "listing_cache.sqlite3")
+    CACHE_MAX_LISTINGS: int = int(os.getenv("CACHE_MAX_LISTINGS", "5000"))
+    CACHE_DEFAULT_TTL: float = float(os.getenv("CACHE_DEFAULT_TTL", "300"))
+    EBAY_CACHE_TTL: float = float(os.getenv("EBAY_CACHE_TTL", "300"))
+    # SerpAPI searches count against a monthly quota, so keep them longer
+    SERPAPI_CACHE_TTL: float = float(os.getenv("SERPAPI_CACHE_TTL", "1800"))
+    # How long past its TTL an entry may still be served while it is refreshed
+    CACHE_STALE_TTL: float = float(os.getenv("CACHE_STALE_TTL", "600"))
+
+    # Latency budget for /compare in seconds (0 = wait for every source).
+    # Sources that miss it are cancelled and the partial result is returned.
+    COMPARE_DEADLINE: float = float(os.getenv("COMPARE_DEADLINE", "5"))
+    # Per-source upstream timeouts in seconds
+    EBAY_TIMEOUT: float = float(os.getenv("EBAY_TIMEOUT", "10"))
+    SERPAPI_TIMEOUT: float = float(os.getenv("SERPAPI_TIMEOUT", "15"))
+
+    # Multi-page searches: pages fetched concurrently per source
+    PAGE_FETCH_CONCURRENCY: int = int(os.getenv("PAGE_FETCH_CONCURRENCY", "2"))
+
+    # Upstream rate limits in requests per second (0 = unlimited)
+    EBAY_RATE_LIMIT: float = float(os.getenv("EBAY_RATE_LIMIT", "5"))
+    SERPAPI_RATE_LIMIT: float = float(os.getenv("SERPAPI_RATE_LIMIT", "1"))
+
+    # Hedged requests: if a call is slower than the source's HEDGE_PERCENTILE latency
+    # (over the last HEDGE_WINDOW calls, at least HEDGE_MIN_DELAY s), send a second
+    # identical request and keep the first answer. Extra calls are capped at
+    # HEDGE_MAX_RATIO of requests (bursts of up to HEDGE_BURST). Off by default: every
+    # hedge spends upstream quota, so operators opt in per source.
+    EBAY_HEDGE: bool = os.getenv("EBAY_HEDGE", "false").lower() == "true"
+    SERPAPI_HEDGE: bool = os.getenv("SERPAPI_HEDGE", "false").lower() == "true"
+    HEDGE_PERCENTILE: float = float(os.getenv("HEDGE_PERCENTILE", "95"))
+    HEDGE_MIN_DELAY: float = float(os.getenv("HEDGE_MIN_DELAY", "0.25"))
+    HEDGE_MAX_RATIO: float = float(os.getenv("HEDGE_MAX_RATIO", "0.05"))
+    HEDGE_BURST: float = float(os.getenv("HEDGE_BURST", "5"))
+    HEDGE_WINDOW: int = int(os.getenv("HEDGE_WINDOW", "200"))
+    HEDGE_MIN_SAMPLES: int = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+    # Circuit breaker: open after N consecutive failures, probe again after cooldown (s)
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_COOLDOWN: float = float(os.getenv("CIRCUIT_COOLDOWN", "30"))
+
+    # Optional file of extra brands for product normalization (one per line)
+    BRANDS_FILE: Optional[str] = os.getenv("BRANDS_FILE")
+    # Memoized normalize_product results (0 disables memoization)
+    NORMALIZE_CACHE_SIZE: int = int(os.getenv("NORMALIZE_CACHE_SIZE", "4096"))
+
+    # Minimum title relevance score (0-1) for a listing to be returned (0 = no filtering)
+    RELEVANCE_THRESHOLD: float = float(os.getenv("RELEVANCE_THRESHOLD", "0.75"))
+
+    # Batch comparisons: distinct queries processed concurrently
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+    # Watchlist: background refresh of watched products (intervals in seconds).
+    # Volatile and frequently read products are refreshed more often, down to
+    # WATCHLIST_MIN_INTERVAL; stable, unread ones every WATCHLIST_REFRESH_INTERVAL.
+    WATCHLIST_ENABLED: bool = os.getenv("WATCHLIST_ENABLED", "true").lower() == "true"
+    WATCHLIST_REFRESH_INTERVAL: float = float(os.getenv("WATCHLIST_REFRESH_INTERVAL", "3600"))
+    WATCHLIST_MIN_INTERVAL: float = float(os.getenv("WATCHLIST_MIN_INTERVAL", "300"))
+    WATCHLIST_DEMAND_HALF_LIFE: float = float(os.getenv("WATCHLIST_DEMAND_HALF_LIFE", "3600"))
+    WATCHLIST_CONCURRENCY: int = int(os.getenv("WATCHLIST_CONCURRENCY", "2"))
+    WATCHLIST_MAX_PRODUCTS: int = int(os.getenv("WATCHLIST_MAX_PRODUCTS", "500"))
+    # Price-change deltas kept per watched product
+    WATCHLIST_MAX_DELTAS: int = int(os.getenv("WATCHLIST_MAX_DELTAS", "1000"))
+    # Per-source opt-in: refreshes bypass the cache, and one watched product can need
+    # hundreds of searches a day, far beyond SerpAPI's 100 a month, so it isn't watched by default
+    EBAY_WATCH: bool = os.getenv("EBAY_WATCH", "true").lower() == "true"
+    SERPAPI_WATCH: bool = os.getenv("SERPAPI_WATCH", "false").lower() == "true"
+
+    # Price history: comparison results appended to columnar files under HISTORY_PATH.
+    # At most one result per query is recorded every HISTORY_SAMPLE_INTERVAL seconds.
+    HISTORY_ENABLED: bool = os.getenv("HISTORY_ENABLED", "true").lower() == "true"
+    HISTORY_PATH: str = os.getenv("HISTORY_PATH", "price_history")
+    HISTORY_SAMPLE_INTERVAL: float = float(os.getenv("HISTORY_SAMPLE_INTERVAL", "300"))
+    HISTORY_FLUSH_INTERVAL: float = float(os.getenv("HISTORY_FLUSH_INTERVAL", "5"))
+
+    # Query log: recent normalized queries with hit counts, merged into QUERY_LOG_PATH every
+    # QUERY_LOG_SAVE_INTERVAL seconds. Queries unseen for QUERY_LOG_MAX_AGE seconds are dropped.
+    QUERY_LOG_ENABLED: bool = os.getenv("QUERY_LOG_ENABLED", "true").lower() == "true"
+    QUERY_LOG_PATH: str = os.getenv("QUERY_LOG_PATH", "query_log.json")
+    QUERY_LOG_MAX_QUERIES: int = int(os.getenv("QUERY_LOG_MAX_QUERIES", "1000"))
+    QUERY_LOG_MAX_AGE: float = float(os.getenv("QUERY_LOG_MAX_AGE", "604800"))
+    QUERY_LOG_SAVE_INTERVAL: float = float(os.getenv("QUERY_LOG_SAVE_INTERVAL", "60"))
+
+    # Startup warm-up: the WARMUP_QUERIES most requested logged queries are fetched into the
+    # search cache at up to WARMUP_RATE queries/second. /ready waits for it up to WARMUP_MAX_WAIT s.
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_QUERIES: int = int(os.getenv("WARMUP_QUERIES", "50"))
+    WARMUP_RATE: float = float(os.getenv("WARMUP_RATE", "2"))
+    WARMUP_MAX_WAIT: float = float(os.getenv("WARMUP_MAX_WAIT", "60"))
+    # Per-source opt-in: SerpAPI's free plan allows 100 searches a month, so it isn't warmed by default
+    EBAY_WARMUP: bool = os.getenv("EBAY_WARMUP", "true").lower() == "true"
+    SERPAPI_WARMUP: bool = os.getenv("SERPAPI_WARMUP", "false").lower() == "true"
+    # Worker processes (gunicorn reads the same variable). With several workers the in-memory
+    # cache is per process, so it isn't warmed; the shared SQLite cache is warmed by one worker.
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+    # Response compression: gzip JSON bodies of at least GZIP_MINIMUM_SIZE bytes
+    GZIP_MINIMUM_SIZE: int = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+    GZIP_COMPRESSLEVEL: int = int(os.getenv("GZIP_COMPRESSLEVEL", "6"))
+    # Browser cache lifetime of the frontend page in seconds (revalidated via ETag after)
+    FRONTEND_MAX_AGE: int = int(os.getenv("FRONTEND_MAX_AGE", "300"))
+
     @property
     def ebay_available(self) -> bool:
         return bool(self.EBAY_APP_ID)
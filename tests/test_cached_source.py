@@ -0,0 +1,64 @@
+import asyncio
+import time
+from typing import List
+
+import pytest
+
+from app.cache import ListingCache
+from app.models import ListingRecord
+from app.sources.base import Source
+from app.sources.cached import CachedSource
+
+
+class SlowSource(Source):
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return "Slow"
+
+    def is_available(self) -> bool:
+        return True
+
+    async def search(self, query: str, page: int = 1) -> List[ListingRecord]:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return []
+
+
+def test_result_is_cached_when_callers_give_up_before_it_arrives():
+    async def run() -> None:
+        upstream = SlowSource(delay=0.3)
+        source = CachedSource(upstream, ListingCache(max_listings=100))
+
+        for _ in range(3):
+            try:
+                await asyncio.wait_for(source.search("sony wh-1000xm5"), 0.1)
+            except asyncio.TimeoutError:
+                pass
+        await asyncio.sleep(0.3)
+
+        assert upstream.calls == 1
+        assert await source.search("Sony WH-1000XM5") == []
+        assert upstream.calls == 1
+
+    asyncio.run(run())
+
+
+def test_served_pages_carry_the_entry_freshness():
+    async def run() -> None:
+        cache = ListingCache(max_listings=100)
+        source = CachedSource(SlowSource(delay=0), cache)
+
+        fetched = await source.search("Sony WH-1000XM5")
+        assert fetched.expires_at == pytest.approx(time.time() + source.cache_ttl, abs=1)
+
+        # A stale entry is served with its (past) expiry while it is refreshed
+        entry = cache.get(source._cache_key("Sony WH-1000XM5", 1))
+        entry.expires_at = time.time() - 10
+        stale = await source.search("Sony WH-1000XM5")
+        assert stale.expires_at == entry.expires_at
+
+    asyncio.run(run())
@@ -0,0 +1,64 @@
+import pytest
+
+from app.deduplicator import TopKListings, _canonicalize, deduplicate_listings, listing_identity
+from app.models import ListingRecord
+
+
+def listing(url: str, price: float, source: str = "eBay", condition: str = "new") -> ListingRecord:
+    return ListingRecord.create(source, price, 0.0, condition, url)
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.ebay.com/itm/123456789012",
+    "http://ebay.com/itm/123456789012/",
+    "https://www.ebay.com/itm/Sony-WH-1000XM5-Headphones/123456789012?hash=item1cbe&_trkparms=ispr%3D1",
+    "https://www.ebay.com/itm/123456789012?_trksid=p2380057&mkcid=1&mkrid=711&campid=53&utm_source=x",
+    "https://www.ebay.com/itm/123456789012?epid=2311&itmmeta=01HX&amdata=enc%3A1",
+])
+def test_ebay_tracking_variants_collapse(url):
+    assert _canonicalize(url) == ("ebay.com/itm/123456789012", "ebay:123456789012")
+
+
+def test_google_shopping_product_params_are_kept():
+    first, _ = _canonicalize("https://www.google.com/shopping/product/1?prds=pid:111&utm_source=x&gclid=y")
+    second, _ = _canonicalize("https://www.google.com/shopping/product/1?prds=pid:222")
+
+    assert first == "google.com/shopping/product/1?prds=pid:111"
+    assert first != second
+
+
+def test_tracking_params_are_only_stripped_on_their_host():
+    amazon, _ = _canonicalize("https://www.amazon.com/dp/B0C1?ref=sr_1_1&tag=aff-20&th=1")
+    other, _ = _canonicalize("https://shop.example.com/p/1?ref=home")
+
+    assert amazon == "amazon.com/dp/b0c1"
+    assert other == "shop.example.com/p/1?ref=home"
+
+
+def test_same_offer_from_two_sources_is_a_duplicate():
+    ebay = listing("https://www.ebay.com/itm/123456789012", 99.0)
+    google = listing("https://www.google.com/shopping/product/9?prds=pid:1", 99.0, "Google Shopping (eBay)")
+    other_seller = listing("https://www.ebay.com/itm/210987654321", 99.0)
+
+    assert deduplicate_listings([ebay, google]) == [ebay]
+    # The offer fingerprint only collapses listings reported by different sources
+    assert deduplicate_listings([ebay, other_seller]) == [ebay, other_seller]
+    assert listing_identity(ebay).offer == listing_identity(google).offer
+
+
+def test_eviction_removes_the_listing_from_the_index():
+    top = TopKListings(2)
+    for url, price in (("https://a.example/1", 10.0), ("https://b.example/1", 20.0), ("https://c.example/1", 5.0)):
+        top.add(listing(url, price, source="Shop"))
+    assert [item.url for item in top.results()] == ["https://c.example/1", "https://a.example/1"]
+
+    # b was evicted, so a cheaper offer at its URL is no longer a duplicate
+    assert top.add(listing("https://b.example/1", 7.0, source="Shop"))
+    assert [item.total_price for item in top.results()] == [5.0, 7.0]
+
+
+def test_duplicate_of_a_held_listing_is_rejected():
+    top = TopKListings(5)
+    assert top.add(listing("https://www.ebay.com/itm/123456789012", 50.0))
+    assert not top.add(listing("https://www.ebay.com/itm/123456789012?_trksid=p1", 40.0))
+    assert len(top) == 1
@@ -0,0 +1,87 @@
+import asyncio
+from typing import List
+
+from app.cache import ListingCache, SqliteListingCache
+from app.fanout import SourceFanOut
+from app.models import ListingPage, ListingRecord
+from app.sources.base import Source
+from app.sources.cached import CachedSource
+from app.sources.coalesced import CoalescedSource
+from app.sources.ebay import EbaySource
+
+
+def listing(number: int) -> ListingRecord:
+    return ListingRecord.create("Paged", 10.0 + number, 0.0, "new", f"https://example.com/{number}")
+
+
+class PagedSource(Source):
+    """Four pages of results; each page loses one item in parsing."""
+
+    def __init__(self, total_pages: int = 4):
+        self.total_pages = total_pages
+        self.pages: List[int] = []
+
+    @property
+    def name(self) -> str:
+        return "Paged"
+
+    @property
+    def page_size(self) -> int:
+        return 4
+
+    def is_available(self) -> bool:
+        return True
+
+    async def search(self, query: str, page: int = 1) -> List[ListingRecord]:
+        self.pages.append(page)
+        first = (page - 1) * self.page_size
+        return ListingPage(
+            (listing(number) for number in range(first, first + self.page_size - 1)),
+            more=page < self.total_pages,
+        )
+
+
+async def collect(fanout: SourceFanOut) -> List[ListingRecord]:
+    return [item async for _source, listings in fanout.results() for item in listings]
+
+
+def test_short_parsed_page_does_not_end_paging():
+    source = PagedSource()
+    listings = asyncio.run(collect(SourceFanOut([source], "query", pages=5)))
+    assert sorted(source.pages) == [1, 2, 3, 4]
+    assert len(listings) == 12
+
+
+def test_page_info_survives_coalescing_and_caching(tmp_path):
+    for cache in (ListingCache(1000), SqliteListingCache(str(tmp_path / "cache.db"), 1000)):
+        source = PagedSource()
+        wrapped = CachedSource(CoalescedSource(source), cache)
+        asyncio.run(collect(SourceFanOut([wrapped], "query", pages=5)))
+        # Served from the cache this time, and still knows pages 1-3 weren't the last
+        listings = asyncio.run(collect(SourceFanOut([wrapped], "query", pages=5)))
+        assert sorted(source.pages) == [1, 2, 3, 4]
+        assert len(listings) == 12
+        cache.close()
+
+
+def test_ebay_page_with_an_unparsable_item_is_not_the_last():
+    ebay = EbaySource()
+    item = {
+        "sellingStatus": [{"currentPrice": [{"__value__": "20.00"}]}],
+        "viewItemURL": ["https://www.ebay.com/itm/1"],
+        "title": ["Item"],
+    }
+    items = [item] * (ebay.page_size - 1) + [{"title": ["No price or URL"]}]
+
+    def response(pagination: dict) -> dict:
+        return {"findItemsByKeywordsResponse": [{
+            "searchResult": [{"item": items}],
+            **pagination,
+        }]}
+
+    page = ebay._parse_response(response({}), page=1)
+    assert len(page) == ebay.page_size - 1 and page.more
+
+    total = {"paginationOutput": [{"totalPages": ["2"]}]}
+    assert ebay._parse_response(response(total), page=1).more
+    assert not ebay._parse_response(response(total), page=2).more
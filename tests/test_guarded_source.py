@@ -0,0 +1,44 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from app.models import ListingRecord
+from app.sources.base import Source, SourceUnavailableError
+from app.sources.guarded import CircuitBreakerSource
+
+
+class BrokenSource(Source):
+    @property
+    def name(self) -> str:
+        return "Broken"
+
+    def is_available(self) -> bool:
+        return True
+
+    async def search(self, query: str, page: int = 1) -> List[ListingRecord]:
+        raise TypeError("malformed upstream result")
+
+
+def test_unexpected_error_in_half_open_probe_reopens_the_circuit():
+    source = CircuitBreakerSource(BrokenSource())
+    source.breaker.cooldown = 0.0
+    source.breaker._open()
+
+    with pytest.raises(TypeError):
+        asyncio.run(source.search("sony wh-1000xm5"))
+
+    assert source.breaker.state == source.breaker.OPEN
+    # After the cooldown the next call probes again instead of failing as unavailable
+    with pytest.raises(TypeError):
+        asyncio.run(source.search("sony wh-1000xm5"))
+
+
+def test_unexpected_errors_count_towards_opening_the_circuit():
+    source = CircuitBreakerSource(BrokenSource())
+    for _ in range(source.breaker.failure_threshold):
+        with pytest.raises(TypeError):
+            asyncio.run(source.search("sony wh-1000xm5"))
+
+    with pytest.raises(SourceUnavailableError):
+        asyncio.run(source.search("sony wh-1000xm5"))
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from app import history
+from app.history import COLUMNS, PriceHistory, _itemsize, _row_count, _window
+from app.models import ListingRecord
+
+
+def listing(price: float, source: str = "eBay") -> ListingRecord:
+    return ListingRecord.create(source, price, 5.0, "new", f"https://example.com/{price}")
+
+
+def test_append_drops_a_half_written_row(tmp_path):
+    store = PriceHistory(str(tmp_path), sample_interval=0)
+    store.record("sony wh1000xm5", [listing(100.0), listing(120.0)])
+    store.flush()
+    directory = store._segment_path("sony wh1000xm5")
+
+    # An append interrupted after writing only some of the columns
+    for name, typecode, _dtype in COLUMNS[:2]:
+        with open(os.path.join(directory, name), "ab") as f:
+            f.write(b"\x01" * _itemsize(typecode))
+    assert _row_count(directory) == 2
+
+    store.record("sony wh1000xm5", [listing(90.0, "Google Shopping (Walmart)")])
+    store.flush()
+
+    assert _row_count(directory) == 3
+    for name, typecode, _dtype in COLUMNS:
+        assert os.path.getsize(os.path.join(directory, name)) == 3 * _itemsize(typecode)
+    stats = store.stats("sony wh1000xm5")
+    assert (stats.count, stats.min, stats.max) == (3, 95.0, 125.0)
+    assert store.lowest("sony wh1000xm5").source == "Google Shopping (Walmart)"
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+@pytest.mark.parametrize("since, until, expected", [
+    (None, None, (0, 6)),
+    (2.0, 3.0, (1, 5)),   # Inclusive at both ends, with repeated timestamps
+    (2.5, 4.0, (3, 5)),
+    (6.0, None, (6, 6)),  # After the last point
+    (None, 0.5, (0, 0)),  # Before the first point
+    (4.0, 2.0, (5, 5)),   # Inverted window is empty
+])
+def test_window_finds_the_rows_in_range(monkeypatch, numpy, since, until, expected):
+    timestamps = [1.0, 2.0, 2.0, 3.0, 3.0, 5.0]
+    if numpy:
+        timestamps = pytest.importorskip("numpy").array(timestamps)
+    else:
+        monkeypatch.setattr(history, "np", None)
+    assert _window(timestamps, since, until) == expected
@@ -0,0 +1,21 @@
+import pytest
+
+from app.normalizer import normalize_product
+
+
+@pytest.mark.parametrize("names", [
+    ("Sony WH-1000XM5", "sony wh1000xm5", "WH-1000XM5 Sony", "best Sony WH-1000XM5 deals"),
+    ("Audio-Technica ATH-M50x", "audio technica ath-m50x"),
+])
+def test_equivalent_names_share_a_key(names):
+    assert len({normalize_product(name).key for name in names}) == 1
+
+
+@pytest.mark.parametrize("first, second", [
+    ("PS5 console", "PS5 controller"),
+    ("Sony A7 IV camera", "Sony A7 IV lens"),
+    ("Apple AirPods Pro earbuds", "Apple AirPods Pro case"),
+    ("Sony WH-1000XM5 headphones", "Sony WH-1000XM5 ear pads"),
+])
+def test_different_product_types_keep_separate_keys(first, second):
+    assert normalize_product(first).key != normalize_product(second).key
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+
+from app import warmup
+from app.normalizer import normalize_product
+from app.warmup import QueryLog
+
+
+def test_hits_recorded_during_an_async_save_are_kept(tmp_path, monkeypatch):
+    path = str(tmp_path / "query_log.json")
+    log = QueryLog(path, max_queries=10, max_age=3600)
+    merging = threading.Event()
+    resume = threading.Event()
+    write_log = warmup._write_log
+
+    def slow_write_log(path, queries):
+        merging.set()
+        resume.wait()
+        write_log(path, queries)
+
+    monkeypatch.setattr(warmup, "_write_log", slow_write_log)
+
+    async def run() -> None:
+        log.record(normalize_product("Bose QC45"))
+        save = asyncio.ensure_future(log.asave())
+        # The merge runs in a thread, so the loop keeps recording meanwhile
+        await asyncio.to_thread(merging.wait)
+        log.record(normalize_product("Bose QC45"))
+        log.record(normalize_product("Apple AirPods Pro"))
+        resume.set()
+        assert await save
+
+    asyncio.run(run())
+    assert log.top(10) == ["Bose QC45", "Apple AirPods Pro"]
+
+    # The hits recorded mid-save are saved next time, not lost or double counted
+    assert log.save()
+    reloaded = QueryLog(path, max_queries=10, max_age=3600)
+    reloaded.load()
+    assert {key: entry.hits for key, entry in reloaded._queries.items()} == {
+        normalize_product("Bose QC45").key: 2,
+        normalize_product("Apple AirPods Pro").key: 1,
+    }
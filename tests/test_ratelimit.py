@@ -0,0 +1,25 @@
+import asyncio
+from typing import List
+
+from app.ratelimit import TokenBucket
+
+
+def test_foreground_calls_go_ahead_of_queued_background_calls():
+    async def run() -> List[str]:
+        bucket = TokenBucket(rate=20, capacity=1)
+        order: List[str] = []
+
+        async def take(name: str, background: bool) -> None:
+            await bucket.acquire(background=background)
+            order.append(name)
+
+        batch = [asyncio.ensure_future(take(f"batch{i}", True)) for i in range(5)]
+        await asyncio.sleep(0.01)  # The batch is queued (and has used the burst)
+        await take("live", False)
+        await asyncio.gather(*batch)
+        return order
+
+    order = asyncio.run(run())
+    # Behind at most the token in flight, not behind the whole batch
+    assert order.index("live") <= 2
+    assert sorted(order) == ["batch0", "batch1", "batch2", "batch3", "batch4", "live"]
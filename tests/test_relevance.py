@@ -0,0 +1,24 @@
+import pytest
+
+from app.normalizer import normalize_product
+from app.relevance import relevance_scorer
+
+
+@pytest.mark.parametrize("query, title", [
+    ("Sony WH-1000XM5", "Sony WH-1000XM5 Wireless Noise Canceling Headphones with Carrying Case"),
+    ("Apple AirPods Pro", "Apple AirPods Pro (2nd Generation) with MagSafe Case (USB-C)"),
+    ("Apple AirPods Pro", "Apple AirPods Pro Wireless Earbuds, includes USB-C charging cable"),
+    ("Audio Technica ATH-M50X", "Audio-Technica ATH-M50x Professional Monitor Headphones"),
+    ("Audio-Technica ATH-M50X", "Audio Technica ATH-M50X Headphones"),
+])
+def test_products_with_bundled_accessories_are_relevant(query, title):
+    assert relevance_scorer(normalize_product(query)).score(title) == 1.0
+
+
+@pytest.mark.parametrize("query, title", [
+    ("Sony WH-1000XM5", "Hard Case for Sony WH-1000XM5 Headphones"),
+    ("Sony WH-1000XM5", "Replacement Ear Pads for Sony WH-1000XM5"),
+    ("Apple AirPods Pro", "Silicone Case Cover Compatible with Apple AirPods Pro"),
+])
+def test_accessory_listings_are_penalized(query, title):
+    assert relevance_scorer(normalize_product(query)).score(title) < 0.75
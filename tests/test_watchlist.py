@@ -0,0 +1,39 @@
+from app.models import ListingRecord
+from app.normalizer import normalize_product
+from app.watchlist import Watchlist
+
+
+def listing(source: str, item: int, price: float) -> ListingRecord:
+    return ListingRecord.create(source, price, 0.0, "new", f"https://example.com/{source}/{item}")
+
+
+def test_failed_source_keeps_its_previous_listings():
+    watchlist = Watchlist(max_products=10, max_deltas=100)
+    product = watchlist.add("Sony WH-1000XM5", normalize_product("Sony WH-1000XM5"), 10, 1)
+    watchlist.record(product.id, {
+        "eBay": [listing("eBay", 1, 250.0), listing("eBay", 2, 260.0)],
+        "Google Shopping": [listing("Shop", 1, 255.0)],
+    }, now=1.0)
+
+    # Google Shopping failed: its listing stays, and only eBay's change is recorded
+    deltas = watchlist.record(product.id, {"eBay": [listing("eBay", 1, 240.0)]}, now=2.0)
+
+    assert sorted(listing.total_price for listing in product.snapshot.values()) == [240.0, 255.0]
+    assert sorted((delta.change, delta.listing.total_price) for delta in deltas) == [
+        ("changed", 240.0),
+        ("removed", 260.0),
+    ]
+
+
+def test_snapshot_keeps_the_cheapest_limit_across_sources():
+    watchlist = Watchlist(max_products=10, max_deltas=100)
+    product = watchlist.add("Sony WH-1000XM5", normalize_product("Sony WH-1000XM5"), 2, 1)
+    watchlist.record(product.id, {
+        "eBay": [listing("eBay", 1, 250.0), listing("eBay", 2, 260.0)],
+        "Google Shopping": [listing("Shop", 1, 255.0)],
+    }, now=1.0)
+    assert sorted(listing.total_price for listing in product.snapshot.values()) == [250.0, 255.0]
+
+    # The kept Google Shopping listing still competes for the top `limit`
+    watchlist.record(product.id, {"eBay": [listing("eBay", 3, 200.0), listing("eBay", 4, 210.0)]}, now=2.0)
+    assert sorted(listing.total_price for listing in product.snapshot.values()) == [200.0, 210.0]